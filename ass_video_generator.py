@@ -8,6 +8,8 @@ from typing import List, Dict, Tuple
 import dotenv
 dotenv.load_dotenv(dotenv_path='.env')
 
+from subtitle_generator import pregrouped_lines
+
 # Load font configurations from environment variables (same keys as MoviePy impl)
 FONT_NAME = os.getenv('FONT_NAME', 'Cascadia-Mono-Regular')
 FONT_COLOR_ACTIVE = os.getenv('FONT_COLOR_ACTIVE', 'yellow')
@@ -93,8 +95,10 @@ class KaraokeVideoGenerator:
     - Uses a black background source at the requested resolution
     """
 
-    def __init__(self, output_dir: str, resolution: str | int | Tuple[int, int] = "1280x720") -> None:
+    def __init__(self, output_dir: str, resolution: str | int | Tuple[int, int] = "1280x720", threads: int | None = None) -> None:
         self.output_dir = output_dir
+        # Threads for libass filtering and the libx264 fallback; NVENC ignores it
+        self.threads = threads or os.cpu_count() or 4
         self.width, self.height, self.scale_factor = _parse_resolution(resolution)
 
         # Scaled typography
@@ -159,6 +163,8 @@ class KaraokeVideoGenerator:
             '-nostats',
             # subtitles overlay
             '-vf', vf_expr,
+            '-filter_threads', str(self.threads),
+            '-threads', str(self.threads),
             # video encode (NVENC)
             '-c:v', 'h264_nvenc',
             '-preset', 'p5',
@@ -297,6 +303,10 @@ class KaraokeVideoGenerator:
     # ---------- Internal helpers ----------
 
     def _group_words_into_lines(self, alignment_data: List[Dict]) -> List[Dict]:
+        # Alignment files that are already grouped into lines only need copying
+        pregrouped = pregrouped_lines(alignment_data)
+        if pregrouped is not None:
+            return pregrouped
         lines: List[Dict] = []
         current_line: List[Dict] = []
         for word in alignment_data:
@@ -6,13 +6,21 @@ from demucs.audio import AudioFile, save_audio
 import torchaudio
 
 class AudioSeparator:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, half_precision=False):
         self.output_dir = output_dir
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # FP16 autocast only applies on CUDA; CPU always runs in FP32
+        self.half_precision = half_precision
         self.model = get_model("htdemucs")
         self.model.to(self.device)
+        self.model.eval()
         
     def separate(self, audio_path):
+        """Separate audio and return the paths to the saved tracks (see separate_with_vocals)"""
+        return self.separate_with_vocals(audio_path)[0]
+        
+    @torch.inference_mode()
+    def separate_with_vocals(self, audio_path):
         """
         Separate audio into 4 tracks using HTDemucs:
         - Drums
@@ -26,7 +34,8 @@ class AudioSeparator:
             audio_path (str): Path to the input audio file
             
         Returns:
-            dict: Dictionary containing paths to all separated tracks
+            tuple: (dict of paths to all separated tracks, vocals tensor, sample rate).
+            The vocals tensor lets the aligner skip reading the vocals file back from disk.
         """
         # Load audio file
         wav = AudioFile(audio_path).read(streams=0, samplerate=self.model.samplerate, channels=self.model.audio_channels)
@@ -34,7 +43,15 @@ class AudioSeparator:
         wav = (wav - ref.mean()) / ref.std()
         
         # Separate sources
-        sources = apply_model(self.model, wav[None], device=self.device)[0]
+        use_half = self.half_precision and self.device == "cuda"
+        with torch.autocast(device_type="cuda", dtype=torch.float16, enabled=use_half):
+            sources = self._apply_model(wav)
+        if use_half:
+            sources = sources.float()
+            if not torch.isfinite(sources).all():
+                # FP16 overflowed somewhere; redo this song in full precision
+                print("Half precision separation produced invalid values, retrying in FP32")
+                sources = self._apply_model(wav)
         sources = sources * ref.std() + ref.mean()
         
         # Save separated tracks
@@ -55,7 +72,11 @@ class AudioSeparator:
         save_audio(instrumental, instrumental_path, self.model.samplerate)
         output_paths['instrumental'] = instrumental_path
         
-        return output_paths
+        return output_paths, sources[self.model.sources.index('vocals')], self.model.samplerate
+
+    def _apply_model(self, wav):
+        """Run the separation model on a normalized waveform"""
+        return apply_model(self.model, wav[None], device=self.device)[0]
 
 if __name__ == "__main__":
     import argparse
@@ -1,11 +1,27 @@
 import sys
 import math
+import numpy as np
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QSlider, QLabel, QScrollArea, QFrame, QSpacerItem, 
                              QSizePolicy, QApplication)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QRect, QPoint
 from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QFontMetrics, QPalette
 
+def word_arrays(words):
+    """Split word dicts into parallel arrays (texts, begins, ends, line_end)"""
+    count = len(words)
+    texts = np.empty(count, dtype=object)
+    texts[:] = [word.get('word', word.get('text', '')) for word in words]
+    return {
+        'texts': texts,
+        'begins': np.fromiter((word.get('start', word.get('begin', 0)) for word in words),
+                              dtype=np.float64, count=count),
+        'ends': np.fromiter((word.get('end', 0) for word in words),
+                            dtype=np.float64, count=count),
+        'line_end': np.fromiter((bool(word.get('line_end', False)) for word in words),
+                                dtype=bool, count=count),
+    }
+
 class AudioTimelineWidget(QWidget):
     """
     Advanced audio timeline widget that looks like a video editor timeline.
@@ -30,12 +46,22 @@ class AudioTimelineWidget(QWidget):
         self.scroll_position = 0.0  # Horizontal scroll position in seconds
         self.word_timings = []  # List of word timing data
         
+        # Sorted column arrays over word_timings (rebuilt lazily when words change)
+        self._word_order = np.empty(0, dtype=np.intp)  # word_timings indices sorted by start time
+        self._word_begins = np.empty(0, dtype=np.float64)  # Start times in sorted order
+        self._word_ends = np.empty(0, dtype=np.float64)  # End times in sorted order
+        self._word_max_ends = np.empty(0, dtype=np.float64)  # Running max of end times in sorted order
+        self._word_texts = np.empty(0, dtype=object)  # Word text in sorted order
+        self._word_line_ends = np.empty(0, dtype=bool)  # line_end flags in sorted order
+        self._word_index_dirty = True
+        
         # Word editing state
         self.selected_word_index = -1  # Index of currently selected word
         self.drag_mode = None  # None, 'move', 'resize_left', 'resize_right'
         self.drag_start_pos = None  # Starting mouse position for drag
         self.drag_start_word_data = None  # Original word data at drag start
         self.hover_word_index = -1  # Index of word being hovered over
+        self.playing_word_index = -1  # Index of word under the playhead
         self.resize_threshold = 5  # Pixels from edge to trigger resize cursor
         self.is_dragging_for_seek = False  # Flag to track if we're dragging for seeking
         
@@ -60,7 +86,49 @@ class AudioTimelineWidget(QWidget):
         self.word_line_end_border_color = QColor(160, 80, 80)
         self.track_label_color = QColor(180, 180, 180)
         
+        # Pens, brushes and colors reused by every repaint instead of rebuilt per word/frame
+        self._border_pen = QPen(QColor(100, 100, 100), 1)
+        self._placeholder_pen = QPen(QColor(150, 150, 150))
+        self._ruler_bg_color = QColor(60, 60, 60)
+        self._ruler_pen = QPen(self.ruler_color)
+        self._minor_marker_pen = QPen(QColor(120, 120, 120))
+        self._track_label_pen = QPen(self.track_label_color)
+        self._word_text_pen = QPen(QColor(0, 0, 0))  # Black text
+        self._selected_fill = QColor(255, 200, 100)  # Bright orange
+        self._selected_pen = QPen(QColor(255, 150, 0), 2)  # Orange border
+        self._hover_line_end_fill = QColor(220, 150, 150)  # Light red
+        self._hover_line_end_pen = QPen(QColor(180, 100, 100), 2)  # Red border
+        self._hover_fill = QColor(150, 220, 150)  # Light green
+        self._hover_pen = QPen(QColor(100, 180, 100), 2)  # Green border
+        self._playing_fill = QColor(255, 240, 130)  # Light yellow
+        self._playing_pen = QPen(QColor(220, 190, 40), 2)  # Yellow border
+        self._word_line_end_pen = QPen(self.word_line_end_border_color, 1)
+        self._word_pen = QPen(self.word_border_color, 1)
+        self._audio_bar_color = QColor(70, 130, 180)  # Steel blue color
+        self._audio_bar_pen = QPen(QColor(50, 100, 150), 2)
+        self._grid_pen = QPen(self.grid_color, 1, Qt.PenStyle.DotLine)
+        self._playhead_pen = QPen(self.playhead_color, 2)
+        self._playhead_outline_pen = QPen(self.playhead_color)
+        self._playhead_brush = QBrush(self.playhead_color)
+        
+        # Fonts and their metrics, built once rather than per repaint/word
+        self._placeholder_font = QFont("Arial", 12)
+        self._ruler_font = QFont("Arial", 8)
+        self._ruler_metrics = QFontMetrics(self._ruler_font)
+        self._track_label_font = QFont("Arial", 9, QFont.Weight.Bold)
+        self._word_font_small = QFont("Arial", 6)  # Smaller font for tight spaces
+        self._word_metrics_small = QFontMetrics(self._word_font_small)
+        self._word_font_medium = QFont("Arial", 7)  # Regular small font
+        self._word_metrics_medium = QFontMetrics(self._word_font_medium)
+        self._word_font_large = QFont("Arial", 8)  # Slightly larger for wider blocks
+        self._word_metrics_large = QFontMetrics(self._word_font_large)
+        
         self.setMinimumHeight(self.timeline_height + 80)  # Extra space for controls
+        
+        # paintEvent fills everything it exposes itself, so skip Qt's erase-before-paint
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground, True)
+        
         self.setup_ui()
         
         # Enable mouse tracking for seeking
@@ -146,12 +214,67 @@ class AudioTimelineWidget(QWidget):
     def set_word_timings(self, word_timings):
         """Set word timing data for display"""
         self.word_timings = word_timings or []
+        self.invalidate_word_index()
         self.update()
         
+    def invalidate_word_index(self):
+        """Mark the sorted word lookup index as stale after word_timings is modified"""
+        self._word_index_dirty = True
+        # Indexes may have shifted; the next position update finds the playing word again
+        self.playing_word_index = -1
+        
+    def _ensure_word_index(self):
+        """Rebuild the sorted column arrays used for binary-search lookups if stale"""
+        if not self._word_index_dirty:
+            return
+        count = len(self.word_timings)
+        columns = word_arrays(self.word_timings)
+        order = np.argsort(columns['begins'], kind='stable')
+        self._word_order = order
+        self._word_begins = columns['begins'][order]
+        self._word_ends = columns['ends'][order]
+        self._word_texts = columns['texts'][order]
+        self._word_line_ends = columns['line_end'][order]
+        # Running max lets us find the first word that can still overlap a time window
+        self._word_max_ends = np.maximum.accumulate(self._word_ends) if count else self._word_ends
+        self._word_index_dirty = False
+        
+    def _visible_word_positions(self, start_time, end_time):
+        """Return sorted-array positions of words overlapping [start_time, end_time]"""
+        self._ensure_word_index()
+        lo = np.searchsorted(self._word_max_ends, start_time, side='left')
+        hi = np.searchsorted(self._word_begins, end_time, side='right')
+        if lo >= hi:
+            return np.empty(0, dtype=np.intp)
+        # Candidates between lo and hi can still end before the window starts
+        return lo + np.flatnonzero(self._word_ends[lo:hi] >= start_time)
+        
+    def visible_words(self, start_time, end_time):
+        """Yield (index, start, end, text, line_end) for words overlapping [start_time, end_time]"""
+        positions = self._visible_word_positions(start_time, end_time)
+        return zip(self._word_order[positions].tolist(),
+                   self._word_begins[positions].tolist(),
+                   self._word_ends[positions].tolist(),
+                   self._word_texts[positions].tolist(),
+                   self._word_line_ends[positions].tolist())
+        
+    def word_index_at_time(self, time_seconds):
+        """Return the index of the word playing at the given time, or -1 if none"""
+        self._ensure_word_index()
+        i = np.searchsorted(self._word_begins, time_seconds, side='right') - 1
+        if i < 0:
+            return -1
+        if self._word_ends[i] >= time_seconds:
+            return int(self._word_order[i])
+        return -1
+        
     def set_position(self, position_seconds):
         """Set the current playback position"""
         self.current_position = max(0, min(position_seconds, self.audio_length))
         
+        # Highlight the word being sung (binary search, cheap at playback rate)
+        self.playing_word_index = self.word_index_at_time(self.current_position)
+        
         # Auto-scroll only if follow playhead is enabled
         if self.follow_playhead_btn.isChecked():
             if self.current_position < self.scroll_position:
@@ -249,18 +372,27 @@ class AudioTimelineWidget(QWidget):
         widget_rect = self.rect()
         timeline_rect = QRect(10, 10, widget_rect.width() - 20, self.timeline_height)
         
+        # Fill the margins around the timeline ourselves (the widget is opaque);
+        # the painter is already clipped to the exposed region
+        window_color = self.palette().color(QPalette.ColorRole.Window)
+        painter.fillRect(0, 0, widget_rect.width(), timeline_rect.top(), window_color)
+        painter.fillRect(0, timeline_rect.top(), timeline_rect.left(), timeline_rect.height(), window_color)
+        painter.fillRect(timeline_rect.right() + 1, timeline_rect.top(),
+                         widget_rect.width() - timeline_rect.right() - 1, timeline_rect.height(), window_color)
+        painter.fillRect(0, timeline_rect.bottom() + 1, widget_rect.width(),
+                         widget_rect.height() - timeline_rect.bottom() - 1, window_color)
+        
         # Fill background
         painter.fillRect(timeline_rect, self.background_color)
         
         # Draw border around timeline
-        painter.setPen(QPen(QColor(100, 100, 100), 1))
+        painter.setPen(self._border_pen)
         painter.drawRect(timeline_rect)
         
         if self.audio_length <= 0:
             # Draw placeholder text when no audio is loaded
-            painter.setPen(QPen(QColor(150, 150, 150)))
-            font = QFont("Arial", 12)
-            painter.setFont(font)
+            painter.setPen(self._placeholder_pen)
+            painter.setFont(self._placeholder_font)
             painter.drawText(timeline_rect, Qt.AlignmentFlag.AlignCenter, "Load audio to see timeline")
             return
             
@@ -292,13 +424,12 @@ class AudioTimelineWidget(QWidget):
     def draw_time_ruler(self, painter, rect, pixels_per_second):
         """Draw the time ruler at the top"""
         # Fill ruler background
-        painter.fillRect(rect, QColor(60, 60, 60))
+        painter.fillRect(rect, self._ruler_bg_color)
         
         # Set up text drawing
-        painter.setPen(QPen(self.ruler_color))
-        font = QFont("Arial", 8)
-        painter.setFont(font)
-        font_metrics = QFontMetrics(font)
+        painter.setPen(self._ruler_pen)
+        painter.setFont(self._ruler_font)
+        font_metrics = self._ruler_metrics
         
         # Calculate time intervals for markers
         visible_duration = self.zoom_level
@@ -341,7 +472,7 @@ class AudioTimelineWidget(QWidget):
             current_time += major_interval
             
         # Minor markers
-        painter.setPen(QPen(QColor(120, 120, 120)))
+        painter.setPen(self._minor_marker_pen)
         first_minor = math.ceil(start_time / minor_interval) * minor_interval
         current_time = first_minor
         
@@ -360,9 +491,8 @@ class AudioTimelineWidget(QWidget):
         painter.fillRect(rect, self.track_bg_color)
         
         # Draw track label
-        painter.setPen(QPen(self.track_label_color))
-        font = QFont("Arial", 9, QFont.Weight.Bold)
-        painter.setFont(font)
+        painter.setPen(self._track_label_pen)
+        painter.setFont(self._track_label_font)
         painter.drawText(rect.x() + 5, rect.y() + 12, "Words")
         
         # Draw word timing blocks
@@ -370,17 +500,8 @@ class AudioTimelineWidget(QWidget):
             start_time = self.scroll_position
             end_time = start_time + self.zoom_level
             
-            for word_index, word_data in enumerate(self.word_timings):
-                # Handle different field names for timing data
-                word_start = word_data.get('start', word_data.get('begin', 0))
-                word_end = word_data.get('end', word_data.get('end', 0))
-                word_text = word_data.get('word', word_data.get('text', ''))
-                is_line_end = word_data.get('line_end', False)
-                
-                # Skip words outside visible range
-                if word_end < start_time or word_start > end_time:
-                    continue
-                    
+            # Only visit words overlapping the visible range (binary search on sorted columns)
+            for word_index, word_start, word_end, word_text, is_line_end in self.visible_words(start_time, end_time):
                 # Calculate word block position and size
                 block_start_x = rect.x() + max(0, (word_start - start_time) * pixels_per_second)
                 block_end_x = rect.x() + min(rect.width(), (word_end - start_time) * pixels_per_second)
@@ -390,52 +511,52 @@ class AudioTimelineWidget(QWidget):
                 word_rect = QRect(int(block_start_x), rect.y() + 15, 
                                  int(block_width), rect.height() - 20)
                 
-                # Choose colors based on selection, hover state, and line end status
+                # Choose colors based on selection, playback, hover state, and line end status
                 if word_index == self.selected_word_index:
                     # Selected word - use bright highlight
-                    fill_color = QColor(255, 200, 100)  # Bright orange
-                    border_color = QColor(255, 150, 0)  # Orange border
-                    border_width = 2
+                    fill_color = self._selected_fill
+                    border_pen = self._selected_pen
+                elif word_index == self.playing_word_index:
+                    # Word under the playhead
+                    fill_color = self._playing_fill
+                    border_pen = self._playing_pen
                 elif word_index == self.hover_word_index:
                     # Hovered word - use lighter highlight
                     if is_line_end:
-                        fill_color = QColor(220, 150, 150)  # Light red
-                        border_color = QColor(180, 100, 100)  # Red border
+                        fill_color = self._hover_line_end_fill
+                        border_pen = self._hover_line_end_pen
                     else:
-                        fill_color = QColor(150, 220, 150)  # Light green
-                        border_color = QColor(100, 180, 100)  # Green border
-                    border_width = 2
+                        fill_color = self._hover_fill
+                        border_pen = self._hover_pen
                 else:
                     # Normal word
                     if is_line_end:
                         fill_color = self.word_line_end_color
-                        border_color = self.word_line_end_border_color
+                        border_pen = self._word_line_end_pen
                     else:
                         fill_color = self.word_color
-                        border_color = self.word_border_color
-                    border_width = 1
+                        border_pen = self._word_pen
                 
                 # Fill word block
                 painter.fillRect(word_rect, fill_color)
                 
                 # Draw word block border
-                painter.setPen(QPen(border_color, border_width))
+                painter.setPen(border_pen)
                 painter.drawRect(word_rect)
                 
                 # Draw word text - be more aggressive about showing text
                 if block_width > 8:  # Show text even in very small blocks
-                    painter.setPen(QPen(QColor(0, 0, 0)))  # Black text
+                    painter.setPen(self._word_text_pen)
                     
                     # Use smaller font for narrow blocks
                     if block_width < 20:
-                        font = QFont("Arial", 6)  # Smaller font for tight spaces
+                        font, font_metrics = self._word_font_small, self._word_metrics_small
                     elif block_width < 40:
-                        font = QFont("Arial", 7)  # Regular small font
+                        font, font_metrics = self._word_font_medium, self._word_metrics_medium
                     else:
-                        font = QFont("Arial", 8)  # Slightly larger for wider blocks
+                        font, font_metrics = self._word_font_large, self._word_metrics_large
                     
                     painter.setFont(font)
-                    font_metrics = QFontMetrics(font)
                     
                     # Use minimal padding (1 pixel on each side)
                     available_width = block_width - 2
@@ -473,23 +594,22 @@ class AudioTimelineWidget(QWidget):
         painter.fillRect(rect, self.track_bg_color)
         
         # Draw track label
-        painter.setPen(QPen(self.track_label_color))
-        font = QFont("Arial", 9, QFont.Weight.Bold)
-        painter.setFont(font)
+        painter.setPen(self._track_label_pen)
+        painter.setFont(self._track_label_font)
         painter.drawText(rect.x() + 5, rect.y() + 15, "Audio")
         
         # Draw audio bar representing the full audio length
         audio_bar_rect = QRect(rect.x() + 60, rect.y() + 10, rect.width() - 70, rect.height() - 20)
         
         # Fill audio bar with a gradient or solid color
-        painter.fillRect(audio_bar_rect, QColor(70, 130, 180))  # Steel blue color
+        painter.fillRect(audio_bar_rect, self._audio_bar_color)
         
         # Draw border around audio bar
-        painter.setPen(QPen(QColor(50, 100, 150), 2))
+        painter.setPen(self._audio_bar_pen)
         painter.drawRect(audio_bar_rect)
         
         # Draw grid lines over the audio bar
-        painter.setPen(QPen(self.grid_color, 1, Qt.PenStyle.DotLine))
+        painter.setPen(self._grid_pen)
         
         # Vertical grid lines (every second)
         start_time = self.scroll_position
@@ -526,7 +646,7 @@ class AudioTimelineWidget(QWidget):
         x = rect.x() + (self.current_position - self.scroll_position) * pixels_per_second
         
         # Draw playhead line
-        painter.setPen(QPen(self.playhead_color, 2))
+        painter.setPen(self._playhead_pen)
         painter.drawLine(int(x), rect.top(), int(x), rect.bottom())
         
         # Draw playhead triangle at top
@@ -537,8 +657,8 @@ class AudioTimelineWidget(QWidget):
             QPoint(int(x + triangle_size/2), rect.top() + triangle_size)
         ]
         
-        painter.setBrush(QBrush(self.playhead_color))
-        painter.setPen(QPen(self.playhead_color))
+        painter.setBrush(self._playhead_brush)
+        painter.setPen(self._playhead_outline_pen)
         painter.drawPolygon(triangle_points)
         
     def mousePressEvent(self, event):
@@ -804,6 +924,25 @@ class AudioTimelineWidget(QWidget):
         """Get the current playhead position in seconds"""
         return self.current_position
     
+    def word_rect(self, index):
+        """Return the on-screen rectangle of a word block (same geometry as draw_word_track)"""
+        if not (0 <= index < len(self.word_timings)) or self.audio_length <= 0:
+            return QRect()
+        timeline_rect = QRect(10, 10, self.rect().width() - 20, self.timeline_height)
+        ruler_rect = QRect(timeline_rect.x(), timeline_rect.y(), 
+                          timeline_rect.width(), self.ruler_height)
+        word_track_y = ruler_rect.bottom() + self.track_spacing
+        pixels_per_second = timeline_rect.width() / self.zoom_level
+        
+        word_data = self.word_timings[index]
+        word_start = word_data.get('start', word_data.get('begin', 0))
+        word_end = word_data.get('end', 0)
+        block_start_x = timeline_rect.x() + max(0, (word_start - self.scroll_position) * pixels_per_second)
+        block_end_x = timeline_rect.x() + min(timeline_rect.width(), (word_end - self.scroll_position) * pixels_per_second)
+        block_width = max(2, block_end_x - block_start_x)
+        return QRect(int(block_start_x), word_track_y + 15, 
+                     int(block_width), self.word_track_height - 20)
+        
     def get_word_at_position(self, mouse_x, mouse_y):
         """Find which word is at the given mouse position"""
         # Calculate if mouse is in word track area
@@ -829,13 +968,8 @@ class AudioTimelineWidget(QWidget):
         start_time = self.scroll_position
         end_time = start_time + self.zoom_level
         
-        for word_index, word_data in enumerate(self.word_timings):
-            word_start = word_data.get('start', word_data.get('begin', 0))
-            word_end = word_data.get('end', word_data.get('end', 0))
-            
-            # Skip words outside visible range
-            if word_end < start_time or word_start > end_time:
-                continue
+        # Only test words overlapping the visible range
+        for word_index, word_start, word_end, _, _ in self.visible_words(start_time, end_time):
                 
             # Calculate word block position
             block_start_x = timeline_rect.x() + max(0, (word_start - start_time) * pixels_per_second)
@@ -876,6 +1010,7 @@ class AudioTimelineWidget(QWidget):
             
             # Update the timing data
             self.word_timings[word_index] = word_data
+            self.invalidate_word_index()
             
             # Emit change signal
             self.word_changed.emit(word_data)
@@ -11,6 +11,7 @@ import gc
 import nltk
 from nltk.metrics.distance import edit_distance
 import heapq
+import functools
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +21,15 @@ print(os.getenv('LD_LIBRARY_PATH'))
 torch.backends.cuda.matmul.allow_tf32 = True
 torch.backends.cudnn.allow_tf32 = True
 
+@functools.lru_cache(maxsize=65536)
+def _segment_cost(asr_segment, lyrics_segment):
+    """Normalized Levenshtein distance between an ASR segment and a lyrics token"""
+    distance = edit_distance(asr_segment.lower(), lyrics_segment.lower().replace("(", "").replace(")", ""))
+    
+    # Normalize by max length to get a fairer comparison across different segment sizes
+    max_len = max(len(asr_segment), len(lyrics_segment))
+    return distance / max_len if max_len > 0 else 0
+
 def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
     """
     Performs many-to-one alignment between ASR tokens and lyrics tokens using Viterbi algorithm
@@ -39,16 +49,21 @@ def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
     
     # Initialize states and backpointers
     # States: (i, j) where i is the index in asr_tokens, j is the index in lyrics_tokens
-    states = [(0, 0)]
+    # The frontier is a heap of (score, state); superseded entries are skipped when popped
+    states = [(0, (0, 0))]
     scores = {(0, 0): 0}
     backpointers = {}
     
-    # Process states in topological order
+    # Joined ASR segments of each length starting at each index, built once
+    asr_segments = [[" ".join(asr_tokens[i:i + count]) for count in range(1, k + 1)]
+                    for i in range(len(asr_tokens))]
+    
+    # Process states in order of lowest score
     while states:
         # Get state with lowest score
-        i, j = min(states, key=lambda s: scores[s])
-        states.remove((i, j))
-        current_score = scores[(i, j)]
+        current_score, (i, j) = heapq.heappop(states)
+        if current_score > scores[(i, j)]:
+            continue
         
         # print(f"\n--- Processing state ({i}, {j}) with score {current_score:.3f} ---")
         
@@ -64,15 +79,11 @@ def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
             
             if i + asr_count <= len(asr_tokens) and j + lyrics_count <= len(lyrics_tokens):
                 # Get the text segments
-                asr_segment = " ".join(asr_tokens[i:i+asr_count])
+                asr_segment = asr_segments[i][asr_count - 1]
                 lyrics_segment = lyrics_tokens[j]  # Just a single lyrics token
                 
-                # Calculate Levenshtein distance as a cost
-                distance = edit_distance(asr_segment.lower(), lyrics_segment.lower().replace("(", "").replace(")", ""))
-                
-                # Normalize by max length to get a fairer comparison across different segment sizes
-                max_len = max(len(asr_segment), len(lyrics_segment))
-                normalized_distance = distance / max_len if max_len > 0 else 0
+                # Levenshtein distance as a cost; repeated words (choruses) hit the cache
+                normalized_distance = _segment_cost(asr_segment, lyrics_segment)
                 
                 # New state and its score
                 new_state = (i + asr_count, j + lyrics_count)
@@ -87,8 +98,7 @@ def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
                     old_score = scores.get(new_state, float('inf'))
                     scores[new_state] = new_score
                     backpointers[new_state] = ((i, j), (asr_count, lyrics_count))
-                    if new_state not in states:
-                        states.append(new_state)
+                    heapq.heappush(states, (new_score, new_state))
                     #print(f"    ✓ Updated state {new_state}: {old_score:.3f} -> {new_score:.3f}")
                 else:
                     # print(f"    ✗ Not better than existing score {scores[new_state]:.3f}")
@@ -104,8 +114,7 @@ def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
                 old_score = scores.get(new_state, float('inf'))
                 scores[new_state] = new_score
                 backpointers[new_state] = ((i, j), ('skip_asr', 0))
-                if new_state not in states:
-                    states.append(new_state)
+                heapq.heappush(states, (new_score, new_state))
                 #print(f"    ✓ Skip ASR[{i}] '{asr_tokens[i]}'")
         
         # Allow skipping lyrics tokens (insertion) - when lyrics have words not in ASR
@@ -118,8 +127,7 @@ def viterbi_many_to_one_alignment(asr_tokens, lyrics_tokens, k=3):
                 old_score = scores.get(new_state, float('inf'))
                 scores[new_state] = new_score
                 backpointers[new_state] = ((i, j), ('skip_lyrics', 0))
-                if new_state not in states:
-                    states.append(new_state)
+                heapq.heappush(states, (new_score, new_state))
                 #print(f"    ✓ Skip Lyrics[{j}] '{lyrics_tokens[j]}'")
     
     # Reconstruct the alignment from backpointers
@@ -223,13 +231,15 @@ class LyricsAligner:
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"Using device: {self.device}")
         
-    def run_asr(self, audio_path):
+    @torch.inference_mode()
+    def run_asr(self, audio_path, audio=None, sample_rate=None):
         """
         Run WhisperX on audio to generate ASR and alignment
         
         Args:
-            audio_path (str): Path to audio file
-            lyrics_path (str, optional): Path to lyrics file, not required for ASR
+            audio_path (str): Path to audio file, also used to name the output files
+            audio (torch.Tensor, optional): Already decoded (channels, samples) audio; skips loading audio_path
+            sample_rate (int, optional): Sample rate of audio
             
         Returns:
             str: Path to the alignment JSON file
@@ -238,7 +248,10 @@ class LyricsAligner:
         print(f"\nProcessing audio file: {audio_path}")
 
         # Load audio and convert to mono
-        audio, sr = torchaudio.load(str(audio_path))
+        if audio is None:
+            audio, sr = torchaudio.load(str(audio_path))
+        else:
+            audio, sr = audio.detach().float().cpu(), sample_rate
         if audio.shape[0] > 1:
             audio = torch.mean(audio, dim=0, keepdim=True)
         
@@ -254,7 +267,8 @@ class LyricsAligner:
         # Use whisperx for transcription (for reference)
         print("\nGenerating transcription...")
         model = whisperx.load_model("medium", self.device)
-        transcription = model.transcribe(str(audio_path), language="en")
+        # Transcribe the already resampled array rather than having WhisperX decode the file again
+        transcription = model.transcribe(audio_nparray, language="en")
         
         # Save transcription data
         transcription_path = self.output_dir / f"{audio_path.stem}_transcription.json"
@@ -360,14 +374,15 @@ class LyricsAligner:
         print("\nMapping Viterbi alignment to timings...")
         lyrics_alignment = []
         
+        # Index the mappings by lyrics token, keeping the first mapping for each
+        alignment_by_lyrics = {}
+        for asr_indices, l_idx in alignment:
+            alignment_by_lyrics.setdefault(l_idx, asr_indices)
+        
         # Process all lyrics tokens in order
         for lyrics_idx, lyrics_token in enumerate(lyrics_tokens):
             # Find if this lyrics token was aligned to any ASR tokens
-            matching_alignment = None
-            for asr_indices, l_idx in alignment:
-                if l_idx == lyrics_idx:
-                    matching_alignment = asr_indices
-                    break
+            matching_alignment = alignment_by_lyrics.get(lyrics_idx)
             
             # Create entry for this lyrics token
             timing_entry = {
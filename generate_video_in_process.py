@@ -1,6 +1,7 @@
 import os
 import json
 import multiprocessing
+from multiprocessing.connection import wait
 from pathlib import Path
 import dotenv
 dotenv.load_dotenv(dotenv_path='.env')
@@ -11,7 +12,7 @@ FONT_COLOR_ACTIVE = os.getenv('FONT_COLOR_ACTIVE', 'yellow')
 FONT_COLOR_INACTIVE = os.getenv('FONT_COLOR_INACTIVE', 'white')
 FONT_KERNING = int(os.getenv('FONT_KERNING', '1'))
 
-def _video_generation_worker(pipe, instrumental_path, alignment_path, output_name, output_dir, resolution, use_wipe, song_title, artist, renderer):
+def _video_generation_worker(pipe, instrumental_path, alignment_path, output_name, output_dir, resolution, use_wipe, song_title, artist, renderer, thread_count):
     """Worker process for video generation"""
     try:
         # Set working directory to the script's directory
@@ -54,7 +55,7 @@ def _video_generation_worker(pipe, instrumental_path, alignment_path, output_nam
         
         try:
             # Initialize video generator
-            generator = KaraokeVideoGenerator(output_dir, resolution)
+            generator = KaraokeVideoGenerator(output_dir, resolution, thread_count)
             
             # Generate video with metadata
             # Pass font selection via environment variable if provided through progress pipe
@@ -81,7 +82,7 @@ def _video_generation_worker(pipe, instrumental_path, alignment_path, output_nam
     finally:
         pipe.close()
 
-def generate_video_in_process(instrumental_path, alignment_path, output_name, output_dir, resolution="1280x720", use_wipe=True, progress_callback=None, song_title=None, artist=None, renderer='moviepy'):
+def generate_video_in_process(instrumental_path, alignment_path, output_name, output_dir, resolution="1280x720", use_wipe=True, progress_callback=None, song_title=None, artist=None, renderer='moviepy', thread_count=None):
     """
     Generate video in a separate process with progress updates
     
@@ -95,6 +96,7 @@ def generate_video_in_process(instrumental_path, alignment_path, output_name, ou
         progress_callback (callable): Function to call with progress updates
         song_title (str): Title of the song for intro
         artist (str): Artist name for intro
+        thread_count (int): ffmpeg encoder threads (defaults to all CPU cores)
         
     Returns:
         str: Path to generated video file
@@ -105,22 +107,32 @@ def generate_video_in_process(instrumental_path, alignment_path, output_name, ou
     # Create and start process
     process = multiprocessing.Process(
         target=_video_generation_worker,
-        args=(child_conn, instrumental_path, alignment_path, output_name, output_dir, resolution, use_wipe, song_title, artist, renderer)
+        args=(child_conn, instrumental_path, alignment_path, output_name, output_dir, resolution, use_wipe, song_title, artist, renderer, thread_count)
     )
     process.start()
+    # Drop our copy of the child's end so recv() sees EOF once the worker exits
+    child_conn.close()
     
-    # Monitor progress
+    # Monitor progress, blocking until a message arrives or the process exits
     result = None
-    while process.is_alive():
-        if parent_conn.poll(0.1):  # Check for messages with timeout
-            msg_type, msg_data = parent_conn.recv()
+    while True:
+        ready = wait([parent_conn, process.sentinel])
+        if parent_conn in ready:
+            try:
+                msg_type, msg_data = parent_conn.recv()
+            except EOFError:
+                break
             
             if msg_type == 'progress' and progress_callback:
                 progress_callback(msg_data)
             elif msg_type == 'finished':
                 result = msg_data
             elif msg_type == 'error':
+                process.join()
                 raise Exception(msg_data)
+        elif not parent_conn.poll():
+            # Process exited with nothing left to read
+            break
     
     # Clean up
     process.join()
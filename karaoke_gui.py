@@ -1,18 +1,21 @@
 import sys
 import os
 import json
+import hashlib
+import collections
+import bisect
+import itertools
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QFileDialog, QLabel, QSlider, 
                              QListWidget, QListWidgetItem, QSplitter, QTextEdit,
                              QProgressBar, QFrame, QSpacerItem, QSizePolicy, QDoubleSpinBox,
                              QCheckBox, QDialog, QLineEdit, QDialogButtonBox, QComboBox)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread, pyqtSlot
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread, QThreadPool, QRunnable, QObject, pyqtSlot
 from PyQt6.QtGui import QFont, QIcon, QKeySequence, QFontDatabase
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
-import threading
 import time
 from audio_timeline_widget import AudioTimelineWidget
 import shutil
@@ -24,6 +27,117 @@ except ImportError:
     PYDUB_AVAILABLE = False
     print("Warning: pydub not available. m4a and other formats may not work.")
 
+# Stylesheets shared by every widget instance
+_WORD_EDIT_QSS = """
+    QTextEdit {
+        color: #2E8B57;
+        padding: 5px;
+        border: 1px solid #ccc;
+        border-radius: 4px;
+    }
+    QTextEdit:focus {
+        border: 1px solid #2E8B57;
+    }
+"""
+_ADD_BTN_QSS = """
+    QPushButton {
+        background-color: #4CAF50;
+        color: white;
+        padding: 8px;
+        border-radius: 4px;
+    }
+    QPushButton:hover {
+        background-color: #45a049;
+    }
+"""
+_DUP_BTN_QSS = """
+    QPushButton {
+        background-color: #2196F3;
+        color: white;
+        padding: 8px;
+        border-radius: 4px;
+    }
+    QPushButton:hover {
+        background-color: #1976D2;
+    }
+"""
+_DELETE_BTN_QSS = """
+    QPushButton {
+        background-color: #f44336;
+        color: white;
+        padding: 8px;
+        border-radius: 4px;
+    }
+    QPushButton:hover {
+        background-color: #d32f2f;
+    }
+"""
+_TIMING_FRAME_QSS = "QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 3px; }"
+_ADJUST_FRAME_QSS = "QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 5px; }"
+_FRAME_QSS = "QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 10px; }"
+_DURATION_LABEL_QSS = "font-weight: bold; color: #4682B4;"
+
+def _encode_json(obj):
+    """Serialize an object to indented UTF-8 JSON bytes"""
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _atomic_write_bytes(path, data):
+    """Write data to a temp file in one call and swap it into place so readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# Path -> (digest, mtime_ns, size) of the last JSON this session wrote there
+_saved_digests = {}
+
+def _atomic_write_json(path, obj):
+    """Atomically write an object as indented JSON, skipping the write if the file already holds it
+    
+    A write is only skipped while the file is still the one we wrote (same mtime
+    and size), so changes made on disk by other tools are always overwritten.
+    """
+    content = _encode_json(obj)
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    key = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+        unchanged = _saved_digests.get(key) == (digest, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        unchanged = False
+    if unchanged:
+        return
+    
+    _atomic_write_bytes(path, content)
+    stat = os.stat(path)
+    _saved_digests[key] = (digest, stat.st_mtime_ns, stat.st_size)
+
+def _fast_copy(src, dst):
+    """Copy a file using in-kernel copy_file_range (reflink on btrfs/xfs) when available"""
+    # Opening dst truncates it, so refuse a copy onto itself first, as shutil.copyfile does
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    copied = False
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    count = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if count == 0:
+                        break
+                    remaining -= count
+                copied = remaining == 0
+        except OSError:
+            copied = False
+    if not copied:
+        # copyfile uses sendfile/fcopyfile where the platform supports it
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
 class ProjectPropertiesDialog(QDialog):
     """Dialog for creating or editing project properties"""
     
@@ -141,10 +255,78 @@ class ProjectPropertiesDialog(QDialog):
             'lyrics_file': self.lyrics_path_edit.text()
         }
 
-class AudioPlayer:
+class BufferPool:
+    """Reuses numpy scratch buffers of a given shape/dtype instead of allocating per block"""
+    
+    def __init__(self):
+        self._buffers = collections.deque()
+        
+    def get(self, shape, dtype):
+        """Take a buffer from the pool, allocating a new one if none matches"""
+        try:
+            buffer = self._buffers.pop()
+        except IndexError:
+            return np.empty(shape, dtype)
+        if buffer.shape == shape and buffer.dtype == dtype:
+            return buffer
+        return np.empty(shape, dtype)
+        
+    def put(self, buffer):
+        """Return a buffer to the pool for reuse"""
+        self._buffers.append(buffer)
+
+class PlaybackThread(QThread):
+    """Thread that writes audio blocks to an output stream until done or interrupted"""
+    playback_finished = pyqtSignal()  # Emitted when the audio played through to the end
+    block_written = pyqtSignal()  # Emitted after each block is handed to the stream
+    
+    def __init__(self, stream, audio_data, start_sample, block_size, buffer_pool):
+        super().__init__()
+        self.stream = stream
+        self.audio_data = audio_data
+        self.start_sample = start_sample
+        self.block_size = block_size
+        self.buffer_pool = buffer_pool
+        
+    def run(self):
+        try:
+            frame = self.start_sample
+            total_frames = len(self.audio_data)
+            block_shape = (self.block_size, self.audio_data.shape[1])
+            
+            # Write until the end of the audio or a stop request; write() blocks inside PortAudio
+            while frame < total_frames and not self.isInterruptionRequested():
+                block = self.audio_data[frame:frame + self.block_size]
+                frames = len(block)
+                buffer = self.buffer_pool.get(block_shape, np.float32)
+                buffer[:frames] = block
+                self.stream.write(buffer[:frames])
+                self.buffer_pool.put(buffer)
+                frame += frames
+                self.block_written.emit()
+                
+            if self.isInterruptionRequested():
+                self.stream.abort()
+            else:
+                # Let the queued audio drain before reporting the end
+                self.stream.stop()
+                self.playback_finished.emit()
+                
+        except Exception as e:
+            print(f"Error in playback thread: {e}")
+        finally:
+            self.stream.close()
+
+class AudioPlayer(QObject):
     """Audio player using sounddevice for reliable playback and seeking"""
+    position_changed = pyqtSignal(float)  # Playback position while playing, once per written block
+    playback_finished = pyqtSignal()  # Emitted when playback reaches the end of the audio
+    
+    BLOCK_SIZE = 4096  # Frames written to the output stream per write() call
+    STREAM_BLOCKSIZE = 2048  # Frames PortAudio pulls from its buffer per host callback
     
     def __init__(self):
+        super().__init__()
         self.audio_file = None
         self.audio_data = None
         self.sample_rate = None
@@ -152,9 +334,11 @@ class AudioPlayer:
         self.is_playing = False
         self.is_paused = False
         self.position = 0
-        self.start_time = 0
+        self.stream = None  # Output stream for the current playback
+        self._stream_start_time = None  # stream.time when playback started
+        self._position_at_start = 0  # Playback position when the stream started
         self.playback_thread = None
-        self.stop_event = threading.Event()
+        self.buffer_pool = BufferPool()
         
     def load_audio(self, file_path):
         """Load an audio file"""
@@ -202,29 +386,6 @@ class AudioPlayer:
             print(f"Error loading audio: {e}")
             return False
     
-    def _playback_worker(self, start_sample):
-        """Worker thread for audio playback"""
-        try:
-            # Calculate the audio slice to play
-            audio_slice = self.audio_data[start_sample:]
-            
-            # Play the audio slice
-            sd.play(audio_slice, self.sample_rate, latency='low')
-            
-            # Wait for playback to finish or stop event
-            while sd.get_stream().active and not self.stop_event.is_set():
-                time.sleep(0.01)
-                
-        except Exception as e:
-            print(f"Error in playback worker: {e}")
-        finally:
-            # Clean up
-            if not self.stop_event.is_set():
-                # Playback finished naturally
-                self.is_playing = False
-                self.is_paused = False
-                self.position = self.audio_length
-    
     def play(self, start_position=None):
         """Start playing audio from current or specified position"""
         if self.audio_data is None:
@@ -240,19 +401,27 @@ class AudioPlayer:
             # Calculate start sample
             start_sample = int(self.position * self.sample_rate)
             
-            # Reset stop event
-            self.stop_event.clear()
-            
-            # Start playback in a separate thread
-            self.playback_thread = threading.Thread(
-                target=self._playback_worker, 
-                args=(start_sample,),
-                daemon=True
-            )
+            # Open the output stream that the worker writes blocks to
+            # High latency gives PortAudio a deep buffer so GIL-heavy work in other
+            # threads (processing, export) can't starve the device and cause crackles
+            self.stream = sd.OutputStream(samplerate=self.sample_rate,
+                                          channels=self.audio_data.shape[1],
+                                          dtype='float32', blocksize=self.STREAM_BLOCKSIZE,
+                                          latency='high')
+            self.stream.start()
+            
+            # Anchor position tracking to the stream's DAC clock
+            self._stream_start_time = self.stream.time
+            self._position_at_start = self.position
+            
+            # Feed the stream from a Qt-managed thread
+            self.playback_thread = PlaybackThread(self.stream, self.audio_data, start_sample,
+                                                  self.BLOCK_SIZE, self.buffer_pool)
+            self.playback_thread.playback_finished.connect(self._on_playback_finished)
+            self.playback_thread.block_written.connect(self._on_block_written)
             
             self.is_playing = True
             self.is_paused = False
-            self.start_time = time.time() - self.position
             
             self.playback_thread.start()
             print(f"Playing from position: {self.position:.2f}s")
@@ -266,12 +435,10 @@ class AudioPlayer:
         """Pause audio playback"""
         if self.is_playing and not self.is_paused:
             # Update position before pausing
-            current_pos = time.time() - self.start_time
-            self.position = min(current_pos, self.audio_length)
+            self.position = self._stream_position()
             
             # Stop the current playback
-            sd.stop()
-            self.stop_event.set()
+            self._stop_playback_thread()
             
             self.is_paused = True
             print(f"Paused at position: {self.position:.2f}s")
@@ -286,19 +453,35 @@ class AudioPlayer:
     def stop(self):
         """Stop audio playback"""
         if self.is_playing or self.is_paused:
-            # Stop sounddevice playback
-            sd.stop()
-            self.stop_event.set()
-            
-            # Wait for playback thread to finish
-            if self.playback_thread and self.playback_thread.is_alive():
-                self.playback_thread.join(timeout=1.0)
+            # Ask the playback thread to abort its stream and wait for it
+            self._stop_playback_thread()
             
             self.is_playing = False
             self.is_paused = False
             self.position = 0
             print("Stopped playback")
     
+    def _stop_playback_thread(self):
+        """Interrupt the playback thread and wait for it to release the stream"""
+        if self.playback_thread is not None:
+            self.playback_thread.playback_finished.disconnect(self._on_playback_finished)
+            self.playback_thread.block_written.disconnect(self._on_block_written)
+            self.playback_thread.requestInterruption()
+            self.playback_thread.wait(1000)
+            self.playback_thread = None
+    
+    def _on_playback_finished(self):
+        """Handle playback reaching the end of the audio (delivered on the GUI thread)"""
+        self.is_playing = False
+        self.is_paused = False
+        self.position = self.audio_length
+        self.playback_finished.emit()
+    
+    def _on_block_written(self):
+        """Publish the stream-clock position after each block (delivered on the GUI thread)"""
+        if self.is_playing and not self.is_paused:
+            self.position_changed.emit(self.get_position())
+    
     def seek(self, position):
         """Seek to a specific position in seconds"""
         old_position = self.position
@@ -310,11 +493,19 @@ class AudioPlayer:
         
         print(f"Seeked from {old_position:.2f}s to {self.position:.2f}s")
     
+    def _stream_position(self):
+        """Playback position derived from the output stream clock"""
+        if self.stream.closed:
+            # The playback thread already closed the stream at the end of the audio
+            return self.audio_length
+        # Samples reach the speaker one output latency after they enter the stream
+        elapsed = max(0.0, self.stream.time - self._stream_start_time - self.stream.latency)
+        return min(self._position_at_start + elapsed, self.audio_length)
+    
     def get_position(self):
         """Get current playback position in seconds"""
         if self.is_playing and not self.is_paused:
-            current_pos = time.time() - self.start_time
-            self.position = min(current_pos, self.audio_length)
+            self.position = self._stream_position()
             
             # Check if playback has finished
             if self.position >= self.audio_length:
@@ -334,34 +525,36 @@ class ProjectLoader:
     def find_audio_file(project_dir):
         """Find the main audio file in project directory"""
         audio_extensions = ('.mp3', '.wav', '.flac', '.m4a', '.aac')
-        project_path = Path(project_dir)
         
-        # Look for files named song first
-        for file in project_path.iterdir():
-            if file.name.lower() == 'song':
-                return str(file)
-
-        # Look for common audio files
-        for file in project_path.iterdir():
-            if file.suffix.lower() in audio_extensions:
-                return str(file)
-        return None
+        # Single pass over regular files: a file named song wins, otherwise the first audio file
+        first_audio = None
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                name = entry.name.lower()
+                if name == 'song':
+                    return entry.path
+                if first_audio is None and name.endswith(audio_extensions):
+                    first_audio = entry.path
+        return first_audio
     
     @staticmethod
     def find_alignment_file(project_dir):
         """Find the alignment JSON file in project directory"""
-        project_path = Path(project_dir)
-        
-        # First look for project file
-        for file in project_path.iterdir():
-            if file.suffix.lower() == '.json' and 'project' in file.name:
-                return str(file)
-                
-        # Then look for alignment file
-        for file in project_path.iterdir():
-            if file.suffix.lower() == '.json' and 'lyrics_alignment' in file.name:
-                return str(file)
-        return None
+        # Single pass over regular files: a project file wins over a lyrics alignment file
+        alignment_file = None
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if not entry.name.lower().endswith('.json'):
+                    continue
+                if 'project' in entry.name:
+                    return entry.path
+                if alignment_file is None and 'lyrics_alignment' in entry.name:
+                    alignment_file = entry.path
+        return alignment_file
     
     @staticmethod
     def load_alignment_data(alignment_file):
@@ -378,26 +571,23 @@ class ProjectLoader:
                 words = data
             # Format 2: Segments with words
             elif isinstance(data, dict) and 'segments' in data:
-                for segment in data['segments']:
-                    if 'words' in segment:
-                        words.extend(segment['words'])
+                words = list(itertools.chain.from_iterable(
+                    segment['words'] for segment in data['segments'] if 'words' in segment))
             # Format 3: Direct words in dict
             elif isinstance(data, dict) and 'words' in data:
                 words = data['words']
             
-            # Convert to standard format
-            standardized_words = []
-            for i, word in enumerate(words):
-                standardized_word = {
+            # Convert to standard format; the timeline builds its column arrays from these
+            standardized_words = [
+                {
                     'text': word.get('word', word.get('text', '')),
                     'index': i,
                     'begin': word.get('start', word.get('begin', 0)),
-                    'end': word.get('end', word.get('end', 0))
+                    'end': word.get('end', 0),
+                    'line_end': bool(word.get('line_end', False))
                 }
-                # Add line_end if available
-                if 'line_end' in word:
-                    standardized_word['line_end'] = word['line_end']
-                standardized_words.append(standardized_word)
+                for i, word in enumerate(words)
+            ]
                 
             return standardized_words
             
@@ -411,9 +601,7 @@ class ProjectLoader:
         try:
             project_path = Path(project_dir)
             project_file = project_path / "metadata.json"
-            
-            with open(project_file, 'w', encoding='utf-8') as f:
-                json.dump(word_data, f, indent=2)
+            _atomic_write_json(project_file, word_data)
             return True
         except Exception as e:
             print(f"Error saving project file: {e}")
@@ -427,6 +615,7 @@ class WordDetailsEditor(QWidget):
     def __init__(self):
         super().__init__()
         self.current_word = None
+        self._displayed_key = None  # Values last written into the editor widgets
         self.setup_ui()
         
     def setup_ui(self):
@@ -444,17 +633,7 @@ class WordDetailsEditor(QWidget):
         self.word_edit.setFixedHeight(35)  
         self.word_edit.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.word_edit.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        self.word_edit.setStyleSheet("""
-            QTextEdit {
-                color: #2E8B57;
-                padding: 5px;
-                border: 1px solid #ccc;
-                border-radius: 4px;
-            }
-            QTextEdit:focus {
-                border: 1px solid #2E8B57;
-            }
-        """)
+        self.word_edit.setStyleSheet(_WORD_EDIT_QSS)
         self.word_edit.textChanged.connect(self.on_word_text_changed)
         word_layout.addWidget(self.word_edit)
         word_layout.addStretch()
@@ -463,7 +642,7 @@ class WordDetailsEditor(QWidget):
         # Timing controls
         timing_frame = QFrame()
         timing_frame.setFrameStyle(QFrame.Shape.Box)
-        timing_frame.setStyleSheet("QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 3px; }")
+        timing_frame.setStyleSheet(_TIMING_FRAME_QSS)
         timing_layout = QVBoxLayout()
         
         # Start time
@@ -492,7 +671,7 @@ class WordDetailsEditor(QWidget):
         duration_layout = QHBoxLayout()
         duration_layout.addWidget(QLabel("Duration:"))
         self.duration_label = QLabel("0.000s")
-        self.duration_label.setStyleSheet("font-weight: bold; color: #4682B4;")
+        self.duration_label.setStyleSheet(_DURATION_LABEL_QSS)
         duration_layout.addWidget(self.duration_label)
         
         # Add line end checkbox to the same row
@@ -509,7 +688,7 @@ class WordDetailsEditor(QWidget):
         # Quick adjustment buttons
         adjust_frame = QFrame()
         adjust_frame.setFrameStyle(QFrame.Shape.Box)
-        adjust_frame.setStyleSheet("QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 5px; }")
+        adjust_frame.setStyleSheet(_ADJUST_FRAME_QSS)
         adjust_layout = QVBoxLayout()
         
         adjust_title = QLabel("Quick Adjustments")
@@ -555,7 +734,12 @@ class WordDetailsEditor(QWidget):
         
     def set_word(self, word_data):
         """Set the current word data for editing"""
+        # Re-selecting the word already shown with unchanged values needs no widget updates
+        displayed = self._display_key(word_data)
+        if word_data is self.current_word and displayed == self._displayed_key:
+            return
         self.current_word = word_data
+        self._displayed_key = displayed
         
         if word_data is None:
             self.word_edit.setText("")
@@ -591,6 +775,17 @@ class WordDetailsEditor(QWidget):
             self.update_duration()
             self.setEnabled(True)
     
+    @staticmethod
+    def _display_key(word_data):
+        """Values shown by the editor for a word, used to detect redundant set_word calls"""
+        if word_data is None:
+            return None
+        return (word_data.get('index'),
+                word_data.get('word', word_data.get('text', '')),
+                word_data.get('start', word_data.get('begin', 0)),
+                word_data.get('end', 0),
+                word_data.get('line_end', False))
+    
     def update_duration(self):
         """Update the duration display"""
         duration = self.end_spinbox.value() - self.start_spinbox.value()
@@ -713,17 +908,55 @@ class WordTimingWidget(QWidget):
         elif isinstance(alignment_data, dict) and 'words' in alignment_data:
             words = alignment_data['words']
             
-        # Populate list
-        for i, word_data in enumerate(words):
-            # Handle different field names
-            word = word_data.get('word', word_data.get('text', '')).strip()
-            start = word_data.get('start', word_data.get('begin', 0))
-            end = word_data.get('end', word_data.get('end', 0))
-            
-            item_text = f"{word} ({start:.2f}s - {end:.2f}s)"
-            item = QListWidgetItem(item_text)
+        # Populate list with updates and signals suspended so the view
+        # relayouts once instead of once per item
+        self.word_list.setUpdatesEnabled(False)
+        self.word_list.blockSignals(True)
+        try:
+            for word_data in words:
+                item = QListWidgetItem(self.format_word_item_text(word_data))
+                item.setData(Qt.ItemDataRole.UserRole, word_data)
+                self.word_list.addItem(item)
+        finally:
+            self.word_list.blockSignals(False)
+            self.word_list.setUpdatesEnabled(True)
+            self.word_list.update()
+            
+    def insert_word(self, index, word_data):
+        """Insert a single word into the list at the given row"""
+        item = QListWidgetItem(self.format_word_item_text(word_data))
+        item.setData(Qt.ItemDataRole.UserRole, word_data)
+        self.word_list.insertItem(index, item)
+        
+    def remove_word(self, index):
+        """Remove the word at the given row from the list"""
+        if 0 <= index < self.word_list.count():
+            self.word_list.takeItem(index)
+            
+    def refresh_words(self, start, words):
+        """Re-store the data of rows from start onwards from the timeline's words
+        
+        setData keeps a copy of the dict, so rows must be refreshed whenever the
+        timeline renumbers its words' 'index'.
+        """
+        for i in range(start, min(self.word_list.count(), len(words))):
+            self.word_list.item(i).setData(Qt.ItemDataRole.UserRole, words[i])
+            
+    def update_word(self, index, word_data):
+        """Refresh the label and data of the word at the given row"""
+        item = self.word_list.item(index)
+        if item is not None:
+            item.setText(self.format_word_item_text(word_data))
             item.setData(Qt.ItemDataRole.UserRole, word_data)
-            self.word_list.addItem(item)
+            
+    @staticmethod
+    def format_word_item_text(word_data):
+        """Build the list item label for a word"""
+        # Handle different field names
+        word = word_data.get('word', word_data.get('text', '')).strip()
+        start = word_data.get('start', word_data.get('begin', 0))
+        end = word_data.get('end', word_data.get('end', 0))
+        return f"{word} ({start:.2f}s - {end:.2f}s)"
             
     def on_word_selected(self, item):
         """Handle word selection"""
@@ -752,11 +985,7 @@ class WordTimingWidget(QWidget):
             if (item_data.get('index', -1) == word_data.get('index', -2)):
                 
                 # Update the item text
-                word = word_data.get('word', word_data.get('text', '')).strip()
-                start = word_data.get('start', word_data.get('begin', 0))
-                end = word_data.get('end', word_data.get('end', 0))
-                item_text = f"{word} ({start:.2f}s - {end:.2f}s)"
-                item.setText(item_text)
+                item.setText(self.format_word_item_text(word_data))
                 
                 # Update the item data
                 item.setData(Qt.ItemDataRole.UserRole, word_data)
@@ -804,54 +1033,24 @@ class WordOperationsWidget(QWidget):
         # Operations frame
         operations_frame = QFrame()
         operations_frame.setFrameStyle(QFrame.Shape.Box)
-        operations_frame.setStyleSheet("QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 10px; }")
+        operations_frame.setStyleSheet(_FRAME_QSS)
         operations_layout = QVBoxLayout()
         
         # Add new word button
         self.add_word_btn = QPushButton("Add New Word")
-        self.add_word_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.add_word_btn.setStyleSheet(_ADD_BTN_QSS)
         self.add_word_btn.clicked.connect(self.add_new_word)
         operations_layout.addWidget(self.add_word_btn)
         
         # Duplicate word button
         self.duplicate_word_btn = QPushButton("Duplicate Word")
-        self.duplicate_word_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                padding: 8px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-            }
-        """)
+        self.duplicate_word_btn.setStyleSheet(_DUP_BTN_QSS)
         self.duplicate_word_btn.clicked.connect(self.duplicate_word)
         operations_layout.addWidget(self.duplicate_word_btn)
         
         # Delete word button
         self.delete_word_btn = QPushButton("Delete Word")
-        self.delete_word_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                padding: 8px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #d32f2f;
-            }
-        """)
+        self.delete_word_btn.setStyleSheet(_DELETE_BTN_QSS)
         self.delete_word_btn.clicked.connect(self.delete_word)
         operations_layout.addWidget(self.delete_word_btn)
         
@@ -861,7 +1060,7 @@ class WordOperationsWidget(QWidget):
         # Rendering settings section under Word Operations
         export_frame = QFrame()
         export_frame.setFrameStyle(QFrame.Shape.Box)
-        export_frame.setStyleSheet("QFrame { border: 1px solid #ccc; border-radius: 5px; padding: 10px; }")
+        export_frame.setStyleSheet(_FRAME_QSS)
         export_layout = QVBoxLayout()
 
         export_title = QLabel("Rendering Settings")
@@ -980,16 +1179,22 @@ class WordOperationsWidget(QWidget):
             return self.font_combo.currentText().strip()
         return ''
 
-class ProcessThread(QThread):
-    """Thread for running the karaoke processing steps"""
+class TaskSignals(QObject):
+    """Signals for pooled background tasks (QRunnable cannot declare signals itself)"""
     progress = pyqtSignal(str)  # Progress message
-    finished = pyqtSignal(dict)  # Results dictionary
+    finished = pyqtSignal(object)  # Task result
     error = pyqtSignal(str)  # Error message
+
+class ProcessTask(QRunnable):
+    """Pooled task for running the karaoke processing steps"""
     
-    def __init__(self, input_dir, output_dir):
+    def __init__(self, input_dir, output_dir, half_precision=False):
         super().__init__()
+        self.setAutoDelete(False)  # Owned by the main window while it runs
+        self.signals = TaskSignals()
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self.half_precision = half_precision
         
     def run(self):
         try:
@@ -999,23 +1204,41 @@ class ProcessThread(QThread):
             result = separate_and_align_in_process(
                 self.input_dir,
                 self.output_dir,
-                progress_callback=lambda msg: self.progress.emit(msg)
+                progress_callback=self.signals.progress.emit,
+                half_precision=self.half_precision
             )
             
             # Emit the results
-            self.finished.emit(result)
+            self.signals.finished.emit(result)
             
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
-class VideoExportThread(QThread):
-    """Thread for generating the karaoke video"""
-    progress = pyqtSignal(str)
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+class CopyFilesTask(QRunnable):
+    """Pooled task that copies project files off the GUI thread"""
     
-    def __init__(self, instrumental_path, alignment_path, output_name, output_dir, resolution="1280x720", use_wipe=True, song_title=None, artist=None, renderer="moviepy"):
+    def __init__(self, copies):
         super().__init__()
+        self.setAutoDelete(False)  # Owned by the main window while it runs
+        self.signals = TaskSignals()
+        self.copies = copies  # List of (source, destination) pairs
+        
+    def run(self):
+        try:
+            for src, dst in self.copies:
+                self.signals.progress.emit(f"Copying {Path(src).name}...")
+                _fast_copy(src, dst)
+            self.signals.finished.emit(None)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+class VideoExportTask(QRunnable):
+    """Pooled task for generating the karaoke video"""
+    
+    def __init__(self, instrumental_path, alignment_path, output_name, output_dir, resolution="1280x720", use_wipe=True, song_title=None, artist=None, renderer="moviepy", thread_count=None):
+        super().__init__()
+        self.setAutoDelete(False)  # Owned by the main window while it runs
+        self.signals = TaskSignals()
         self.instrumental_path = instrumental_path
         self.alignment_path = alignment_path
         self.output_name = output_name
@@ -1025,6 +1248,7 @@ class VideoExportThread(QThread):
         self.song_title = song_title
         self.artist = artist
         self.renderer = renderer
+        self.thread_count = thread_count or os.cpu_count()
         
     def run(self):
         try:
@@ -1038,19 +1262,20 @@ class VideoExportThread(QThread):
                 self.output_dir,
                 self.resolution,
                 self.use_wipe,
-                progress_callback=self.progress.emit,
+                progress_callback=self.signals.progress.emit,
                 song_title=self.song_title,
                 artist=self.artist,
-                renderer=self.renderer
+                renderer=self.renderer,
+                thread_count=self.thread_count
             )
             
             if result:
-                self.finished.emit(result)
+                self.signals.finished.emit(result)
             else:
-                self.error.emit("Video generation failed")
+                self.signals.error.emit("Video generation failed")
                 
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 class KaraokeEditorMainWindow(QMainWindow):
     """Main window for the karaoke timing editor"""
@@ -1059,6 +1284,9 @@ class KaraokeEditorMainWindow(QMainWindow):
         super().__init__()
         self.audio_player = AudioPlayer()
         self.current_project_dir = None
+        self._project_path = None  # Path form of current_project_dir
+        self._metadata_path = None  # metadata.json inside the project
+        self._project_json_path = None  # project.json inside the project
         self.project_metadata = {
             'name': '',
             'artist': '',
@@ -1066,8 +1294,19 @@ class KaraokeEditorMainWindow(QMainWindow):
             'audio_file': '',
             'lyrics_file': ''
         }
-        self.process_thread = None
-        self.export_thread = None
+        self.process_task = None
+        self.export_task = None
+        self.copy_task = None
+        self._reindex_from = None  # Earliest word whose 'index' is stale, or None
+        # Processing and export tasks share the global pool instead of spawning a thread each
+        self.thread_pool = QThreadPool.globalInstance()
+        self.thread_pool.setMaxThreadCount(os.cpu_count() or 1)
+        # Background progress is latched here and painted at most every 100 ms
+        self._pending_status = None
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(100)
+        self.status_timer.timeout.connect(self._show_pending_status)
         self.setup_ui()
         
     def setup_ui(self):
@@ -1111,13 +1350,17 @@ class KaraokeEditorMainWindow(QMainWindow):
         project_layout.addWidget(save_button)
         
         # Add process and export buttons
-        process_button = QPushButton("Align Audio")
-        process_button.clicked.connect(self.process_project)
-        project_layout.addWidget(process_button)
+        self.process_button = QPushButton("Align Audio")
+        self.process_button.clicked.connect(self.process_project)
+        project_layout.addWidget(self.process_button)
+        
+        self.half_precision_checkbox = QCheckBox("Fast GPU (FP16)")
+        self.half_precision_checkbox.setToolTip("Run vocal separation in half precision on CUDA GPUs")
+        project_layout.addWidget(self.half_precision_checkbox)
         
-        export_button = QPushButton("Export Video")
-        export_button.clicked.connect(self.export_video)
-        project_layout.addWidget(export_button)
+        self.export_button = QPushButton("Export Video")
+        self.export_button.clicked.connect(self.export_video)
+        project_layout.addWidget(self.export_button)
         
         export_subtitles_button = QPushButton("Export Subtitles")
         export_subtitles_button.clicked.connect(self.export_subtitles)
@@ -1163,7 +1406,6 @@ class KaraokeEditorMainWindow(QMainWindow):
         self.audio_timeline.position_changed.connect(self.on_timeline_seek)
         self.audio_timeline.word_selected.connect(self.on_word_selected)
         self.audio_timeline.word_changed.connect(lambda word: self.on_word_changed(word, 'timeline'))
-        self.word_details_editor.word_changed.connect(self.on_word_changed)
         main_layout.addWidget(self.audio_timeline)
         
         # Simple audio controls
@@ -1180,10 +1422,12 @@ class KaraokeEditorMainWindow(QMainWindow):
         controls_layout.addStretch()
         main_layout.addLayout(controls_layout)
         
-        # Timer for updating timeline position
+        # Playback drives the timeline position; the timer is only a fallback while playing
+        self.audio_player.position_changed.connect(self.audio_timeline.set_position)
+        self.audio_player.playback_finished.connect(self.update_timeline_position)
         self.position_timer = QTimer()
+        self.position_timer.setInterval(250)
         self.position_timer.timeout.connect(self.update_timeline_position)
-        self.position_timer.start(10)  # Update every 10ms
 
         # Status bar
         self.statusBar().showMessage("Ready - Open a project folder to begin")
@@ -1226,13 +1470,24 @@ class KaraokeEditorMainWindow(QMainWindow):
         if folder:
             self.load_project(folder)
             
+    def _set_project_dir(self, project_dir):
+        """Set the current project directory and cache its Path and fixed file paths"""
+        self.current_project_dir = str(project_dir)
+        self._project_path = Path(project_dir)
+        self._metadata_path = self._project_path / "metadata.json"
+        self._project_json_path = self._project_path / "project.json"
+        
     def load_project(self, project_dir):
         """Load a karaoke project from directory"""
-        self.current_project_dir = project_dir
-        project_path = Path(project_dir)
+        self._set_project_dir(project_dir)
+        self._load_metadata()
+        self._load_audio()
+        self._load_alignment()
         
+    def _load_metadata(self):
+        """Load metadata.json for the current project and update the project label"""
         # Load metadata if it exists
-        metadata_file = project_path / "metadata.json"
+        metadata_file = self._metadata_path
         if metadata_file.exists():
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -1259,10 +1514,12 @@ class KaraokeEditorMainWindow(QMainWindow):
                 display_name = f"{self.project_metadata['artist']} - {display_name}"
             self.project_label.setText(f"Project: {display_name}")
         else:
-            self.project_label.setText(f"Project: {project_path.name}")
-        
+            self.project_label.setText(f"Project: {self._project_path.name}")
+            
+    def _load_audio(self):
+        """Decode the current project's audio file into the player"""
         # Find and load audio file
-        audio_file = ProjectLoader.find_audio_file(project_dir)
+        audio_file = ProjectLoader.find_audio_file(self.current_project_dir)
         if audio_file:
             if self.audio_player.load_audio(audio_file):
                 # Set audio length in timeline
@@ -1274,8 +1531,10 @@ class KaraokeEditorMainWindow(QMainWindow):
         else:
             self.statusBar().showMessage("No audio file found in project")
             
+    def _load_alignment(self):
+        """Load the current project's word timings into the list and timeline"""
         # Find and load alignment data
-        alignment_file = ProjectLoader.find_alignment_file(project_dir)
+        alignment_file = ProjectLoader.find_alignment_file(self.current_project_dir)
         if alignment_file:
             alignment_data = ProjectLoader.load_alignment_data(alignment_file)
             if alignment_data:
@@ -1286,9 +1545,8 @@ class KaraokeEditorMainWindow(QMainWindow):
                 if isinstance(alignment_data, list):
                     word_timings = alignment_data
                 elif isinstance(alignment_data, dict) and 'segments' in alignment_data:
-                    for segment in alignment_data['segments']:
-                        if 'words' in segment:
-                            word_timings.extend(segment['words'])
+                    word_timings = list(itertools.chain.from_iterable(
+                        segment['words'] for segment in alignment_data['segments'] if 'words' in segment))
                 elif isinstance(alignment_data, dict) and 'words' in alignment_data:
                     word_timings = alignment_data['words']
                 
@@ -1309,18 +1567,22 @@ class KaraokeEditorMainWindow(QMainWindow):
                 playhead_position = self.audio_timeline.get_position()
                 self.audio_player.play(playhead_position)
                 self.play_button.setText("Pause")
+                self.position_timer.start()
             else:
                 self.audio_player.pause()
                 self.play_button.setText("Play")
+                self.position_timer.stop()
         else:
             # Get current playhead position from timeline
             playhead_position = self.audio_timeline.get_position()
             self.audio_player.play(playhead_position)
             self.play_button.setText("Pause")
+            self.position_timer.start()
             
     def stop_audio(self):
         """Stop audio playback"""
         self.audio_player.stop()
+        self.position_timer.stop()
         # Reset timeline position to beginning when stopping
         self.audio_timeline.set_position(0)
         self.play_button.setText("Play")
@@ -1343,6 +1605,7 @@ class KaraokeEditorMainWindow(QMainWindow):
                 # When paused or stopped, don't update timeline position
                 # This preserves the playhead position for resume
                 self.play_button.setText("Play")
+                self.position_timer.stop()
     
     def on_timeline_word_selected(self, word_data):
         """Handle word selection from timeline"""
@@ -1350,6 +1613,7 @@ class KaraokeEditorMainWindow(QMainWindow):
         
     def on_word_changed(self, word_data, source):
         """Handle word changes from any source"""
+        self._flush_reindex()
         # Update the timeline display
         if hasattr(self.audio_timeline, 'selected_word_index') and \
            self.audio_timeline.selected_word_index >= 0 and \
@@ -1357,8 +1621,13 @@ class KaraokeEditorMainWindow(QMainWindow):
             # Update the word in the timeline's data
             index = self.audio_timeline.selected_word_index
             if 0 <= index < len(self.audio_timeline.word_timings):
+                old_rect = self.audio_timeline.word_rect(index)
                 self.audio_timeline.word_timings[index] = word_data
-                self.audio_timeline.update()  # Trigger redraw
+                self.audio_timeline.invalidate_word_index()
+                # Only repaint the area covered by the word before and after the change,
+                # padded for the selection border
+                dirty_rect = old_rect.united(self.audio_timeline.word_rect(index))
+                self.audio_timeline.update(dirty_rect.adjusted(-3, -3, 3, 3))
 
         # Update the word details editor display if change came from timeline
         if source != 'details' and hasattr(self.word_details_editor, 'current_word'):
@@ -1369,6 +1638,7 @@ class KaraokeEditorMainWindow(QMainWindow):
         
     def on_word_selected(self, word_data):
         """Handle word selection from any source"""
+        self._flush_reindex()
         if word_data:
             # Update word details editor
             self.word_details_editor.set_word(word_data)
@@ -1377,15 +1647,24 @@ class KaraokeEditorMainWindow(QMainWindow):
             # Select word in list
             self.word_timing_widget.select_word(word_data)
             
-            # Find and select the word in the timeline
-            for i, word in enumerate(self.audio_timeline.word_timings):
-                if (word.get('index', -1) == word_data.get('index', -2)):
-                    self.audio_timeline.set_selected_word(i)
-                    break
+            # 'index' is the word's position in the timeline; scan only if it is stale
+            word_timings = self.audio_timeline.word_timings
+            index = word_data.get('index', -1)
+            if 0 <= index < len(word_timings) and word_timings[index].get('index', -1) == index:
+                self.audio_timeline.set_selected_word(index)
+            else:
+                for i, word in enumerate(word_timings):
+                    if (word.get('index', -1) == word_data.get('index', -2)):
+                        self.audio_timeline.set_selected_word(i)
+                        break
 
     def closeEvent(self, event):
         """Handle application close"""
         self.audio_player.stop()
+        # Only shut down the processing worker if it was ever imported
+        worker_module = sys.modules.get('separate_and_align_in_process')
+        if worker_module is not None:
+            worker_module.shutdown_worker()
         event.accept()
 
     def keyPressEvent(self, event):
@@ -1409,19 +1688,16 @@ class KaraokeEditorMainWindow(QMainWindow):
             return
             
         # Get word data from timeline
+        self._flush_reindex()
         word_data = self.audio_timeline.word_timings
         
         # Save both word data and metadata
         try:
-            project_path = Path(self.current_project_dir)
-            
             # Save word data
-            with open(project_path / "project.json", 'w', encoding='utf-8') as f:
-                json.dump(word_data, f, indent=2)
+            _atomic_write_json(self._project_json_path, word_data)
                 
             # Save metadata
-            with open(project_path / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(self.project_metadata, f, indent=2)
+            _atomic_write_json(self._metadata_path, self.project_metadata)
                 
             self.statusBar().showMessage("Project saved successfully")
         except Exception as e:
@@ -1429,12 +1705,9 @@ class KaraokeEditorMainWindow(QMainWindow):
 
     def add_word(self, word_data):
         """Add a new word to the timeline"""
-        # Find the correct index to insert the word
-        insert_index = 0
-        for i, word in enumerate(self.audio_timeline.word_timings):
-            if word.get('begin', 0) > word_data['begin']:
-                break
-            insert_index = i + 1
+        # Binary search for the insertion point after any words starting at the same time
+        insert_index = bisect.bisect_right(self.audio_timeline.word_timings, word_data['begin'],
+                                           key=lambda word: word.get('begin', 0))
             
         # Create a copy of the word data to avoid reference issues
         new_word = {
@@ -1448,46 +1721,76 @@ class KaraokeEditorMainWindow(QMainWindow):
         # Insert the word
         self.audio_timeline.word_timings.insert(insert_index, new_word)
         
-        # Update all indexes
-        self.update_word_indexes()
+        # Only the words after the insertion point change index
+        self.schedule_reindex(insert_index)
         
         # Update displays
+        self.audio_timeline.invalidate_word_index()
         self.audio_timeline.update()
-        self.word_timing_widget.load_alignment_data(self.audio_timeline.word_timings)
+        self.word_timing_widget.insert_word(insert_index, new_word)
         
         # Select the new word
         self.audio_timeline.set_selected_word(insert_index)
         
     def delete_word(self, word_data):
         """Delete a word from the timeline"""
-        # Find the index of the word to delete
-        delete_index = -1
-        for i, word in enumerate(self.audio_timeline.word_timings):
-            if (word.get('text', '') == word_data.get('text', '') and
-                word.get('begin', 0) == word_data.get('begin', 0)):
-                delete_index = i
-                break
+        self._flush_reindex()
+        # Words carry their list position in 'index'; fall back to a scan if it is stale
+        word_timings = self.audio_timeline.word_timings
+        delete_index = word_data.get('index', -1)
+        if not (0 <= delete_index < len(word_timings) and
+                self._is_same_word(word_timings[delete_index], word_data)):
+            delete_index = -1
+            for i, word in enumerate(word_timings):
+                if self._is_same_word(word, word_data):
+                    delete_index = i
+                    break
                 
         if delete_index >= 0:
             # Remove the word
-            self.audio_timeline.word_timings.pop(delete_index)
+            word_timings.pop(delete_index)
             
-            # Update all indexes
-            self.update_word_indexes()
+            # Only the words after the deleted one change index
+            self.schedule_reindex(delete_index)
             
             # Update displays
+            self.audio_timeline.invalidate_word_index()
             self.audio_timeline.update()
-            self.word_timing_widget.load_alignment_data(self.audio_timeline.word_timings)
+            self.word_timing_widget.remove_word(delete_index)
             
             # Clear selection
             self.audio_timeline.set_selected_word(-1)
             self.word_details_editor.set_word(None)
             self.word_operations.set_word(None)
             
-    def update_word_indexes(self):
-        """Update the index field for all words"""
-        for i, word in enumerate(self.audio_timeline.word_timings):
-            word['index'] = i
+    @staticmethod
+    def _is_same_word(word, word_data):
+        """Check whether a timeline word matches the given word data"""
+        return word is word_data or (word.get('text', '') == word_data.get('text', '') and
+                                     word.get('begin', 0) == word_data.get('begin', 0))
+        
+    def schedule_reindex(self, start):
+        """Mark indexes from start onwards as stale and renumber them on the next event loop tick"""
+        if self._reindex_from is None:
+            self._reindex_from = start
+            QTimer.singleShot(0, self._flush_reindex)
+        else:
+            self._reindex_from = min(self._reindex_from, start)
+            
+    def _flush_reindex(self):
+        """Apply any pending index renumbering in a single pass"""
+        if self._reindex_from is not None:
+            start = self._reindex_from
+            self._reindex_from = None
+            self.update_word_indexes(start)
+        
+    def update_word_indexes(self, start=0):
+        """Update the index field for words from start to the end of the list"""
+        word_timings = self.audio_timeline.word_timings
+        for i in range(start, len(word_timings)):
+            word_timings[i]['index'] = i
+        # The list rows hold copies, so bring their indexes in line too
+        self.word_timing_widget.refresh_words(start, word_timings)
 
     def center_timeline_on_word(self, center_position):
         """Center the timeline view on a specific word"""
@@ -1526,27 +1829,30 @@ class KaraokeEditorMainWindow(QMainWindow):
                 
             project_dir.mkdir(parents=True, exist_ok=True)
             
-            # Copy files to project directory
             audio_ext = Path(project_data['audio_file']).suffix
-            shutil.copy2(project_data['audio_file'], project_dir / f"song{audio_ext}")
-            shutil.copy2(project_data['lyrics_file'], project_dir / "lyrics.txt")
-            
-            # Update metadata
-            self.project_metadata = {
-                'name': project_data['name'],
-                'artist': project_data['artist'],
-                'resolution': project_data['resolution'],
-                'audio_file': str(project_dir / f"song{audio_ext}"),
-                'lyrics_file': str(project_dir / "lyrics.txt")
-            }
             
-            # Save metadata
-            with open(project_dir / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(self.project_metadata, f, indent=2)
+            def finish():
+                # Update metadata
+                self.project_metadata = {
+                    'name': project_data['name'],
+                    'artist': project_data['artist'],
+                    'resolution': project_data['resolution'],
+                    'audio_file': str(project_dir / f"song{audio_ext}"),
+                    'lyrics_file': str(project_dir / "lyrics.txt")
+                }
                 
-            # Load the new project
-            self.load_project(str(project_dir))
-            self.statusBar().showMessage(f"Created new project: {project_data['name']}")
+                # Save metadata
+                _atomic_write_json(project_dir / "metadata.json", self.project_metadata)
+                    
+                # Load the new project
+                self.load_project(str(project_dir))
+                self.statusBar().showMessage(f"Created new project: {project_data['name']}")
+            
+            # Copy files to project directory in the background, then finish
+            self.copy_files_then([
+                (project_data['audio_file'], project_dir / f"song{audio_ext}"),
+                (project_data['lyrics_file'], project_dir / "lyrics.txt"),
+            ], finish)
             
     def edit_project(self):
         """Edit current project properties"""
@@ -1569,43 +1875,76 @@ class KaraokeEditorMainWindow(QMainWindow):
             sanitized_name = sanitized_name.replace(' ', '_')
             
             # Update project directory if name changed
-            if sanitized_name != Path(self.current_project_dir).name:
+            if sanitized_name != self._project_path.name:
                 new_dir = Path("songs") / sanitized_name
                 if new_dir.exists():
                     self.statusBar().showMessage("Error: A project with this name already exists")
                     return
                     
                 # Rename directory
-                old_dir = Path(self.current_project_dir)
-                old_dir.rename(new_dir)
-                self.current_project_dir = str(new_dir)
+                self._project_path.rename(new_dir)
+                self._set_project_dir(new_dir)
                 
             # Copy new files if they changed
+            copies = []
             if new_data['audio_file'] != self.project_metadata['audio_file']:
                 audio_ext = Path(new_data['audio_file']).suffix
-                shutil.copy2(new_data['audio_file'], Path(self.current_project_dir) / f"song{audio_ext}")
-                new_data['audio_file'] = str(Path(self.current_project_dir) / f"song{audio_ext}")
+                audio_dest = self._project_path / f"song{audio_ext}"
+                copies.append((new_data['audio_file'], audio_dest))
+                new_data['audio_file'] = str(audio_dest)
                 
             if new_data['lyrics_file'] != self.project_metadata['lyrics_file']:
-                shutil.copy2(new_data['lyrics_file'], Path(self.current_project_dir) / "lyrics.txt")
-                new_data['lyrics_file'] = str(Path(self.current_project_dir) / "lyrics.txt")
-                
-            # Update metadata with original name and directory
-            self.project_metadata = {
-                'name': new_data['name'],  # Keep original name with special characters
-                'artist': new_data['artist'],
-                'resolution': new_data.get('resolution', '360'),
-                'audio_file': new_data['audio_file'],
-                'lyrics_file': new_data['lyrics_file'],
-            }
+                lyrics_dest = self._project_path / "lyrics.txt"
+                copies.append((new_data['lyrics_file'], lyrics_dest))
+                new_data['lyrics_file'] = str(lyrics_dest)
                 
-            # Save metadata
-            with open(Path(self.current_project_dir) / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(self.project_metadata, f, indent=2)
+            def finish():
+                # Update metadata with original name and directory
+                self.project_metadata = {
+                    'name': new_data['name'],  # Keep original name with special characters
+                    'artist': new_data['artist'],
+                    'resolution': new_data.get('resolution', '360'),
+                    'audio_file': new_data['audio_file'],
+                    'lyrics_file': new_data['lyrics_file'],
+                }
+                    
+                # Save metadata
+                _atomic_write_json(self._metadata_path, self.project_metadata)
+                    
+                # Reload project
+                self.load_project(self.current_project_dir)
+                self.statusBar().showMessage("Project updated successfully")
                 
-            # Reload project
-            self.load_project(self.current_project_dir)
-            self.statusBar().showMessage("Project updated successfully")
+            self.copy_files_then(copies, finish)
+            
+    def copy_files_then(self, copies, callback):
+        """Copy (source, destination) pairs on the thread pool and call callback when done"""
+        if not copies:
+            callback()
+            return
+        self.copy_task = CopyFilesTask(copies)
+        self.copy_task.signals.progress.connect(self.set_pending_status)
+        self.copy_task.signals.finished.connect(lambda _: (self._clear_pending_status(), callback()))
+        self.copy_task.signals.error.connect(
+            lambda error_msg: (self._clear_pending_status(),
+                               self.statusBar().showMessage(f"Error copying project files: {error_msg}")))
+        self.thread_pool.start(self.copy_task)
+
+    def set_pending_status(self, message):
+        """Latch a progress message; only the latest one is shown when the timer fires"""
+        self._pending_status = message
+        if not self.status_timer.isActive():
+            self.status_timer.start()
+            
+    def _show_pending_status(self):
+        if self._pending_status is not None:
+            self.statusBar().showMessage(self._pending_status)
+            self._pending_status = None
+            
+    def _clear_pending_status(self):
+        """Drop queued progress so it cannot overwrite a final status message"""
+        self.status_timer.stop()
+        self._pending_status = None
 
     def process_project(self):
         """Run the processing steps (separation and alignment) in background"""
@@ -1614,51 +1953,35 @@ class KaraokeEditorMainWindow(QMainWindow):
             return
             
         # Disable process button while running
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Align Audio":
-                button.setEnabled(False)
-                break
+        self.process_button.setEnabled(False)
                 
         # Create and start processing thread
-        self.process_thread = ProcessThread(self.current_project_dir, self.current_project_dir)
-        self.process_thread.progress.connect(self.statusBar().showMessage)
-        self.process_thread.finished.connect(self.on_processing_finished)
-        self.process_thread.error.connect(self.on_processing_error)
-        self.process_thread.start()
+        self.process_task = ProcessTask(self.current_project_dir, self.current_project_dir,
+                                        self.half_precision_checkbox.isChecked())
+        self.process_task.signals.progress.connect(self.set_pending_status,
+                                                   Qt.ConnectionType.QueuedConnection)
+        self.process_task.signals.finished.connect(self.on_processing_finished)
+        self.process_task.signals.error.connect(self.on_processing_error)
+        self.thread_pool.start(self.process_task)
         
     def on_processing_finished(self, results):
         """Handle successful completion of processing"""
+        self._clear_pending_status()
         # Re-enable process button
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Align Audio":
-                button.setEnabled(True)
-                break
-                
-        self.statusBar().showMessage("Project processed successfully")
-
-    def on_processing_finished(self, results):
-        """Handle successful completion of processing"""
-        # Re-enable process button
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Align Audio":
-                button.setEnabled(True)
-                break
+        self.process_button.setEnabled(True)
                 
         # Delete project.json if it exists
-        project_json = Path(self.current_project_dir) / "project.json"
-        if project_json.exists():
-            project_json.unlink()
+        if self._project_json_path.exists():
+            self._project_json_path.unlink()
 
-        # Reload the project to show new alignment data
-        self.load_project(self.current_project_dir)
+        # Only the alignment changed; keep the decoded audio and metadata
+        self._load_alignment()
         
     def on_processing_error(self, error_msg):
         """Handle processing error"""
+        self._clear_pending_status()
         # Re-enable process button
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Align Audio":
-                button.setEnabled(True)
-                break
+        self.process_button.setEnabled(True)
                 
         self.statusBar().showMessage(f"Error: {error_msg}")
             
@@ -1668,34 +1991,31 @@ class KaraokeEditorMainWindow(QMainWindow):
             self.statusBar().showMessage("No project loaded to export")
             return
             
-        # Find the instrumental and alignment files
-        project_path = Path(self.current_project_dir)
+        # Find the instrumental and alignment files in a single directory pass
+        project_path = self._project_path
         instrumental_path = None
-        alignment_path = None
-        
-        # Look for instrumental file
-        for file in project_path.iterdir():
-            if file.name.startswith('song_instrumental'):
-                instrumental_path = str(file)
-                break
-                
-        # Look for alignment file
-        for file in project_path.iterdir():
-            if file.name.endswith('project.json'):
-                alignment_path = str(file)
-                break
-            if file.name.endswith('lyrics_alignment.json'):
-                alignment_path = str(file)
+        project_json_path = None
+        lyrics_alignment_path = None
+        with os.scandir(project_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if instrumental_path is None and name.startswith('song_instrumental'):
+                    instrumental_path = entry.path
+                elif project_json_path is None and name.endswith('project.json'):
+                    project_json_path = entry.path
+                elif lyrics_alignment_path is None and name.endswith('lyrics_alignment.json'):
+                    lyrics_alignment_path = entry.path
+                # The edited project file beats the raw alignment, so stop once both are known
+                if instrumental_path and project_json_path:
+                    break
+        alignment_path = project_json_path or lyrics_alignment_path
                 
         if not instrumental_path or not alignment_path:
             self.statusBar().showMessage("Error: Could not find required files for video generation")
             return
             
         # Disable export button while running
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Export Video":
-                button.setEnabled(False)
-                break
+        self.export_button.setEnabled(False)
                 
         # Get output name, metadata, and resolution
         output_name = self.project_metadata['name'] if self.project_metadata['name'] else project_path.name
@@ -1717,39 +2037,36 @@ class KaraokeEditorMainWindow(QMainWindow):
         if selected_font:
             os.environ['FONT_NAME'] = selected_font
 
-        self.export_thread = VideoExportThread(
+        self.export_task = VideoExportTask(
             instrumental_path,
             alignment_path,
             output_name,
-            str(project_path),
+            os.fspath(project_path),
             resolution=resolution,
             use_wipe=True,
             song_title=song_title,
             artist=artist,
             renderer=selected_renderer
         )
-        self.export_thread.progress.connect(self.statusBar().showMessage)
-        self.export_thread.finished.connect(self.on_export_finished)
-        self.export_thread.error.connect(self.on_export_error)
-        self.export_thread.start()
+        self.export_task.signals.progress.connect(self.set_pending_status,
+                                                  Qt.ConnectionType.QueuedConnection)
+        self.export_task.signals.finished.connect(self.on_export_finished)
+        self.export_task.signals.error.connect(self.on_export_error)
+        self.thread_pool.start(self.export_task)
         
     def on_export_finished(self, video_path):
         """Handle successful completion of video export"""
+        self._clear_pending_status()
         # Re-enable export button
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Export Video":
-                button.setEnabled(True)
-                break
+        self.export_button.setEnabled(True)
                 
         self.statusBar().showMessage(f"Video exported successfully: {video_path}")
         
     def on_export_error(self, error_msg):
         """Handle video export error"""
+        self._clear_pending_status()
         # Re-enable export button
-        for button in self.findChildren(QPushButton):
-            if button.text() == "Export Video":
-                button.setEnabled(True)
-                break
+        self.export_button.setEnabled(True)
                 
         self.statusBar().showMessage(f"Error: {error_msg}")
 
@@ -1,37 +1,41 @@
 import os
 import argparse
+import queue
+import threading
+import concurrent.futures
 from pathlib import Path
 from audio_separation import AudioSeparator
 from forced_alignment import LyricsAligner
 from video_generator import KaraokeVideoGenerator
 
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.aac')
+
 def find_input_files(input_dir):
     """Find audio and lyrics files in the input directory"""
-    input_path = Path(input_dir)
-    audio_extensions = ('.mp3', '.wav', '.flac', '.m4a', '.aac')
-    audio_file = None
+    song_files = {}
+    first_audio = None
     lyrics_file = None
     
-    # First look for a file named "song" with any audio extension
-    for ext in audio_extensions:
-        song_file = input_path / f"song{ext}"
-        if song_file.exists():
-            audio_file = song_file
-            break
-            
-    # If no "song" file found, take first audio file
-    if not audio_file:
-        for file in input_path.iterdir():
-            if file.suffix.lower() in audio_extensions:
-                audio_file = file
-                break
-                
-    # Look for lyrics file
-    for file in input_path.iterdir():
-        if file.suffix.lower() == '.txt':
-            lyrics_file = file
-            
-    return audio_file, lyrics_file
+    # Single directory read, bucketing entries by extension
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            # is_file() uses the cached directory entry type, so this costs no extra stat
+            if not entry.is_file():
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext in AUDIO_EXTENSIONS:
+                # A file named "song" takes priority over any other audio file
+                if stem == 'song':
+                    song_files[ext] = entry.path
+                elif first_audio is None:
+                    first_audio = entry.path
+            elif ext == '.txt':
+                lyrics_file = entry.path
+    
+    audio_file = next((song_files[ext] for ext in AUDIO_EXTENSIONS if ext in song_files), first_audio)
+    return (Path(audio_file) if audio_file else None,
+            Path(lyrics_file) if lyrics_file else None)
 
 def run_full_karaoke_process(input_dir, output_dir, song_name=None):
     """
@@ -71,14 +75,14 @@ def run_full_karaoke_process(input_dir, output_dir, song_name=None):
         
         # Initialize components
         print("Initializing processing components...")
-        separator = AudioSeparator(str(output_path))
-        aligner = LyricsAligner(str(output_path))
-        video_gen = KaraokeVideoGenerator(str(output_path), resolution="360")
+        separator = AudioSeparator(output_path)
+        aligner = LyricsAligner(output_path)
+        video_gen = KaraokeVideoGenerator(output_path, resolution="360")
         
         # Step 1: Vocal Separation
         print("\n--- STEP 1: VOCAL SEPARATION ---")
         print("Separating vocals from instrumental using HTDemucs...")
-        separation_results = separator.separate(str(audio_file))
+        separation_results, vocals_audio, sample_rate = separator.separate_with_vocals(os.fspath(audio_file))
         
         vocal_path = separation_results['vocals']
         instrumental_path = separation_results['instrumental']
@@ -91,12 +95,13 @@ def run_full_karaoke_process(input_dir, output_dir, song_name=None):
         print("Running ASR transcription...")
         
         # Generate ASR alignment
-        asr_alignment_path = aligner.run_asr(vocal_path)
+        # Hand over the separated vocals in memory instead of re-reading the WAV
+        asr_alignment_path = aligner.run_asr(vocal_path, vocals_audio, sample_rate)
         print(f"✓ ASR transcription complete: {asr_alignment_path}")
         
         print("Running Viterbi alignment with lyrics...")
         # Align ASR to lyrics using Viterbi
-        final_alignment_path = aligner.align_to_lyrics(asr_alignment_path, str(lyrics_file))
+        final_alignment_path = aligner.align_to_lyrics(asr_alignment_path, os.fspath(lyrics_file))
         print(f"✓ Viterbi alignment complete: {final_alignment_path}")
         
         # Step 3: Video Generation
@@ -109,8 +114,8 @@ def run_full_karaoke_process(input_dir, output_dir, song_name=None):
         # Summary
         print("\n=== PROCESS COMPLETE ===")
         results = {
-            'original_audio': str(audio_file),
-            'lyrics': str(lyrics_file),
+            'original_audio': os.fspath(audio_file),
+            'lyrics': os.fspath(lyrics_file),
             'vocals': vocal_path,
             'instrumental': instrumental_path,
             'asr_alignment': asr_alignment_path,
@@ -132,6 +137,130 @@ def run_full_karaoke_process(input_dir, output_dir, song_name=None):
         traceback.print_exc()
         return None
 
+def find_batch_songs(input_dir):
+    """Find (audio, lyrics, name) tuples for each song subdirectory of the input directory"""
+    songs = []
+    for song_dir in sorted(Path(input_dir).iterdir()):
+        if not song_dir.is_dir():
+            continue
+        audio_file, lyrics_file = find_input_files(song_dir)
+        if not audio_file or not lyrics_file:
+            print(f"Skipping {song_dir.name}: could not find both audio and lyrics files")
+            continue
+        songs.append((audio_file, lyrics_file, song_dir.name))
+    return songs
+
+def run_karaoke_pipeline(songs, output_dir, video_workers=2):
+    """
+    Run the full karaoke process for several songs with the stages overlapped.
+    
+    Separation and alignment are GPU-bound and each run serially on their own
+    thread, connected by a queue. Finished alignments are handed to a thread
+    pool that renders videos, so CPU-bound encoding of earlier songs overlaps
+    with GPU work on later ones. Each song is written to its own
+    subdirectory of output_dir.
+    
+    Args:
+        songs: List of (audio_file, lyrics_file, name) tuples
+        output_dir: Directory for output files
+        video_workers: Number of videos rendered at once (each ffmpeg encode is
+            already multithreaded, so a small number is enough)
+    
+    Returns:
+        list: Result dicts for the songs that completed, in completion order
+    """
+    print(f"=== KARAOKE MAKER - PIPELINE ({len(songs)} songs) ===\n")
+    output_path = Path(output_dir)
+    
+    # Small queue keeps at most one separated song waiting for the aligner
+    to_align = queue.Queue(maxsize=1)
+    results = []
+    
+    # Set when the aligner thread exits so the separator stops waiting to hand songs over
+    aligner_stopped = threading.Event()
+    
+    def hand_off(item):
+        """Queue an item for the aligner; returns False if the aligner is gone"""
+        while not aligner_stopped.is_set():
+            try:
+                to_align.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def separator_worker():
+        try:
+            separator = AudioSeparator(output_path)
+            for audio_file, lyrics_file, name in songs:
+                try:
+                    song_dir = output_path / name
+                    song_dir.mkdir(parents=True, exist_ok=True)
+                    separator.output_dir = song_dir
+                    print(f"[separation] {name}")
+                    separation_results, vocals_audio, sample_rate = separator.separate_with_vocals(os.fspath(audio_file))
+                    if not hand_off((audio_file, lyrics_file, name, song_dir, separation_results, vocals_audio, sample_rate)):
+                        print("[separation] Aligner stopped, skipping remaining songs")
+                        break
+                except Exception as e:
+                    print(f"[separation] Error processing {name}: {e}")
+        except Exception as e:
+            print(f"[separation] Failed to load the separation model: {e}")
+        finally:
+            # Always tell the aligner there is nothing more to come
+            hand_off(None)
+    
+    def aligner_worker(render_pool):
+        try:
+            aligner = LyricsAligner(output_path)
+            while (job := to_align.get()) is not None:
+                audio_file, lyrics_file, name, song_dir, separation_results, vocals_audio, sample_rate = job
+                try:
+                    aligner.output_dir = song_dir
+                    print(f"[alignment] {name}")
+                    asr_alignment_path = aligner.run_asr(separation_results['vocals'], vocals_audio, sample_rate)
+                    final_alignment_path = aligner.align_to_lyrics(asr_alignment_path, os.fspath(lyrics_file))
+                    render_pool.submit(render_song, audio_file, lyrics_file, name, song_dir, separation_results,
+                                       asr_alignment_path, final_alignment_path)
+                except Exception as e:
+                    print(f"[alignment] Error processing {name}: {e}")
+        except Exception as e:
+            print(f"[alignment] Failed to load the alignment model: {e}")
+        finally:
+            aligner_stopped.set()
+    
+    def render_song(audio_file, lyrics_file, name, song_dir, separation_results, asr_alignment_path, final_alignment_path):
+        try:
+            # Generators are cheap to create; one per song keeps concurrent renders independent
+            video_gen = KaraokeVideoGenerator(song_dir, resolution="360", verbose=False)
+            print(f"[video] {name}")
+            video_path = video_gen.generate(separation_results['instrumental'], final_alignment_path, name)
+            results.append({
+                'original_audio': os.fspath(audio_file),
+                'lyrics': os.fspath(lyrics_file),
+                'vocals': separation_results['vocals'],
+                'instrumental': separation_results['instrumental'],
+                'asr_alignment': asr_alignment_path,
+                'final_alignment': final_alignment_path,
+                'karaoke_video': video_path,
+                'base_name': name
+            })
+            print(f"✓ Karaoke video generated: {video_path}")
+        except Exception as e:
+            print(f"[video] Error processing {name}: {e}")
+    
+    # Leaving the executor block waits for the last queued renders
+    with concurrent.futures.ThreadPoolExecutor(max_workers=video_workers) as render_pool:
+        workers = [threading.Thread(target=separator_worker, daemon=True),
+                   threading.Thread(target=aligner_worker, args=(render_pool,), daemon=True)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    
+    print(f"\n=== PIPELINE COMPLETE: {len(results)}/{len(songs)} songs ===")
+    return results
+
 def run_test_mode(input_dir, output_dir):
     """Run only the alignment and test video generation"""
     # Get paths
@@ -140,21 +269,20 @@ def run_test_mode(input_dir, output_dir):
     base_name = input_path.name
     
     audio_path = input_path / 'song_vocals.wav'
-    lyrics_path = input_path / 'lyrics.txt'
     
     # Initialize components
-    aligner = LyricsAligner(str(output_path))
-    video_gen = KaraokeVideoGenerator(str(output_path))
+    aligner = LyricsAligner(output_path)
+    video_gen = KaraokeVideoGenerator(output_path)
     
     # Perform alignment
     print(f"Aligning lyrics with audio...")
     alignment_path = output_path / 'song_vocals_alignment.json'
     alignment_path.parent.mkdir(parents=True, exist_ok=True)
-    alignment_data = aligner.run_asr(str(audio_path), str(lyrics_path))
+    alignment_data = aligner.run_asr(os.fspath(audio_path))
     
     # Generate test video
     print(f"Generating test video...")
-    video_path = video_gen.test_alignment(str(audio_path), str(alignment_path), base_name)
+    video_path = video_gen.test_alignment(os.fspath(audio_path), os.fspath(alignment_path), base_name)
     
     print(f"Test process completed successfully!")
     print(f"Alignment file: {alignment_path}")
@@ -170,16 +298,16 @@ def run_separation_only(input_dir, output_dir):
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    separator = AudioSeparator(str(output_path))
+    separator = AudioSeparator(output_path)
     
     print(f"Separating audio: {audio_file.name}")
-    results = separator.separate(str(audio_file))
+    results = separator.separate(os.fspath(audio_file))
     
     print("Separation complete!")
     for track, path in results.items():
         print(f"  {track}: {path}")
 
-def run_process_mode(input_dir, output_dir):
+def run_process_mode(input_dir, output_dir, separator=None, aligner=None):
     """
     Run the processing steps without video generation:
     1. Vocal separation using Demucs
@@ -188,7 +316,8 @@ def run_process_mode(input_dir, output_dir):
     Args:
         input_dir: Directory containing audio and lyrics files
         output_dir: Directory for output files
-        song_name: Optional custom name for output files (defaults to audio filename)
+        separator: Optional AudioSeparator to reuse instead of loading a new model
+        aligner: Optional LyricsAligner to reuse
     
     Returns:
         dict: Paths to all generated files
@@ -216,13 +345,19 @@ def run_process_mode(input_dir, output_dir):
         
         # Initialize components
         print("Initializing processing components...")
-        separator = AudioSeparator(str(output_path))
-        aligner = LyricsAligner(str(output_path))
+        if separator is None:
+            separator = AudioSeparator(output_path)
+        else:
+            separator.output_dir = output_path
+        if aligner is None:
+            aligner = LyricsAligner(output_path)
+        else:
+            aligner.output_dir = output_path
         
         # Step 1: Vocal Separation
         print("\n--- STEP 1: VOCAL SEPARATION ---")
         print("Separating vocals from instrumental using HTDemucs...")
-        separation_results = separator.separate(str(audio_file))
+        separation_results, vocals_audio, sample_rate = separator.separate_with_vocals(os.fspath(audio_file))
         
         vocal_path = separation_results['vocals']
         instrumental_path = separation_results['instrumental']
@@ -235,19 +370,20 @@ def run_process_mode(input_dir, output_dir):
         print("Running ASR transcription...")
         
         # Generate ASR alignment
-        asr_alignment_path = aligner.run_asr(vocal_path)
+        # Hand over the separated vocals in memory instead of re-reading the WAV
+        asr_alignment_path = aligner.run_asr(vocal_path, vocals_audio, sample_rate)
         print(f"✓ ASR transcription complete: {asr_alignment_path}")
         
         print("Running Viterbi alignment with lyrics...")
         # Align ASR to lyrics using Viterbi
-        final_alignment_path = aligner.align_to_lyrics(asr_alignment_path, str(lyrics_file))
+        final_alignment_path = aligner.align_to_lyrics(asr_alignment_path, os.fspath(lyrics_file))
         print(f"✓ Viterbi alignment complete: {final_alignment_path}")
         
         # Summary
         print("\n=== PROCESS COMPLETE ===")
         results = {
-            'original_audio': str(audio_file),
-            'lyrics': str(lyrics_file),
+            'original_audio': os.fspath(audio_file),
+            'lyrics': os.fspath(lyrics_file),
             'vocals': vocal_path,
             'instrumental': instrumental_path,
             'asr_alignment': asr_alignment_path,
@@ -273,8 +409,8 @@ def main():
     parser.add_argument('--input_dir', help='Directory containing audio and lyrics files (not required for effects mode)')
     parser.add_argument('--output_dir', help='Directory for output files')
     parser.add_argument('--song_name', help='Custom name for output files (defaults to audio filename)')
-    parser.add_argument('--mode', choices=['full', 'test', 'separation', 'effects', 'process'], default='full',
-                       help='Processing mode: full (complete process), test (alignment only), separation (audio separation only), effects (karaoke effects test), process (separation + alignment without video)')
+    parser.add_argument('--mode', choices=['full', 'test', 'separation', 'effects', 'process', 'batch'], default='full',
+                       help='Processing mode: full (complete process), test (alignment only), separation (audio separation only), effects (karaoke effects test), process (separation + alignment without video), batch (full process for each song subdirectory of input_dir)')
     args = parser.parse_args()
     
     # Set default output directory to input directory if not specified
@@ -296,6 +432,8 @@ def main():
         run_separation_only(args.input_dir, args.output_dir)
     elif args.mode == 'process':
         run_process_mode(args.input_dir, args.output_dir)
+    elif args.mode == 'batch':
+        run_karaoke_pipeline(find_batch_songs(args.input_dir), args.output_dir)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,12 +1,85 @@
 import os
 import json
+import threading
 import multiprocessing
+from multiprocessing.connection import wait
 from pathlib import Path
 import dotenv
 dotenv.load_dotenv(dotenv_path='.env')
 
-def _separation_alignment_worker(pipe, input_dir, output_dir):
-    """Worker process for audio separation and alignment"""
+# Modules the forkserver imports once so each worker forks from a warm interpreter
+_PRELOAD_MODULES = ['torch', 'demucs', 'main']
+
+def _get_context():
+    """Use a forkserver with heavy modules preloaded where available, spawn otherwise"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        # Only takes effect before the forkserver starts; later calls are harmless
+        ctx.set_forkserver_preload(_PRELOAD_MODULES)
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+def _configure_torch():
+    """Let cuDNN autotune convolution kernels and allow TF32 matmuls for the worker's lifetime"""
+    import torch
+    if torch.cuda.is_available():
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+
+class _ProgressSink:
+    """Buffers progress lines and sends them through the pipe in batches"""
+    
+    FLUSH_INTERVAL = 0.05  # Seconds between background flushes
+    MAX_LINES = 32  # Flush immediately once this many lines are buffered
+    
+    def __init__(self, pipe):
+        self.pipe = pipe
+        self.lines = []
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+        
+    def write(self, line):
+        with self.lock:
+            self.lines.append(line)
+            full = len(self.lines) >= self.MAX_LINES
+        if full:
+            self.flush()
+            
+    def flush(self):
+        """Send all buffered lines as one newline-joined progress message"""
+        with self.lock:
+            self._flush_locked()
+            
+    def send(self, message):
+        """Flush buffered progress, then send a message without racing the background flusher"""
+        with self.lock:
+            self._flush_locked()
+            self.pipe.send(message)
+            
+    def _flush_locked(self):
+        if self.lines:
+            self.pipe.send(('progress', '\n'.join(self.lines)))
+            self.lines.clear()
+            
+    def _flush_loop(self):
+        while not self.closed.wait(self.FLUSH_INTERVAL):
+            self.flush()
+            
+    def close(self):
+        """Stop the background flusher and send whatever is left"""
+        if not self.closed.is_set():
+            self.closed.set()
+            self.thread.join()
+        self.flush()
+
+def _separation_alignment_worker(pipe):
+    """Persistent worker process that runs separation and alignment jobs sent over the pipe"""
+    import builtins
+    original_print = builtins.print
+    sink = None
     try:
         # Set working directory to the script's directory
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -16,69 +89,175 @@ def _separation_alignment_worker(pipe, input_dir, output_dir):
         
         from main import run_process_mode
         
-        # Override print function to send through pipe
-        import builtins
-        original_print = builtins.print
+        # Override print function to batch messages through the pipe
+        sink = _ProgressSink(pipe)
         def custom_print(*args, **kwargs):
-            msg = ' '.join(str(arg) for arg in args)
-            pipe.send(('progress', msg))
+            sink.write(' '.join(str(arg) for arg in args))
             original_print(*args, **kwargs)
         builtins.print = custom_print
         
-        try:
-            # Run audio separation and alignment
-            result = run_process_mode(input_dir, output_dir)
+        # Models are created on the first job and reused for every later one
+        separator = None
+        aligner = None
+        
+        while True:
+            job = pipe.recv()
+            if job is None:
+                break
+            input_dir, output_dir, half_precision = job
             
-            # Send success result
-            pipe.send(('finished', result))
-            
-        finally:
-            # Restore original print function
-            builtins.print = original_print
+            try:
+                if separator is None:
+                    _configure_torch()
+                    from audio_separation import AudioSeparator
+                    from forced_alignment import LyricsAligner
+                    separator = AudioSeparator(output_dir)
+                    aligner = LyricsAligner(output_dir)
+                
+                separator.half_precision = half_precision
+                
+                # Run audio separation and alignment
+                result = run_process_mode(input_dir, output_dir, separator, aligner)
+                
+                # Send any buffered progress before the result
+                sink.send(('finished', result))
+            except Exception as e:
+                sink.send(('error', str(e)))
             
+    except (EOFError, OSError):
+        # Parent went away
+        pass
     except Exception as e:
-        # Send error
-        pipe.send(('error', str(e)))
+        # Startup failed (e.g. an import error); report it before exiting
+        try:
+            pipe.send(('error', str(e)))
+        except OSError:
+            pass
     finally:
+        # Restore original print function
+        builtins.print = original_print
+        if sink is not None:
+            sink.close()
         pipe.close()
 
-def separate_and_align_in_process(input_dir, output_dir, progress_callback=None):
+class _PersistentWorker:
+    """Owns the long-lived worker process and its end of the pipe"""
+    
+    def __init__(self):
+        ctx = _get_context()
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_separation_alignment_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        # Drop our copy of the child's end so recv() sees EOF if the worker exits
+        child_conn.close()
+        
+    def is_alive(self):
+        return self.process.is_alive()
+        
+    def close(self, timeout=5):
+        """Ask the worker to exit, terminating it if it does not stop in time"""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        
+    def terminate(self):
+        """Stop the worker immediately, abandoning any job it is running"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+# _worker_lock only guards the _worker reference; _job_lock runs one job at a time
+_worker = None
+_worker_lock = threading.Lock()
+_job_lock = threading.Lock()
+
+def _discard_worker(worker):
+    """Terminate a worker and forget it so the next job starts a fresh one"""
+    global _worker
+    with _worker_lock:
+        if _worker is worker:
+            _worker = None
+    worker.terminate()
+
+def shutdown_worker():
+    """Stop the persistent worker process, if one was started, without waiting for a running job"""
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is None:
+        return
+    if _job_lock.acquire(blocking=False):
+        # Idle: let it exit cleanly
+        try:
+            worker.close()
+        finally:
+            _job_lock.release()
+    else:
+        # Mid-job: kill the process; the job's receive loop sees it exit and cleans up
+        worker.process.terminate()
+
+def separate_and_align_in_process(input_dir, output_dir, progress_callback=None, half_precision=False):
     """
     Run audio separation and alignment in a separate process with progress updates
     
+    The worker process is started on first use and kept alive so torch, CUDA
+    and the model weights are only loaded once per session.
+    
     Args:
         input_dir (str): Directory containing input audio files
         output_dir (str): Directory for output files
         progress_callback (callable): Function to call with progress updates
+        half_precision (bool): Run separation under FP16 autocast when CUDA is available
         
     Returns:
         dict: Results from audio separation and alignment
     """
-    # Create pipe for communication
-    parent_conn, child_conn = multiprocessing.Pipe()
-    
-    # Create and start process
-    process = multiprocessing.Process(
-        target=_separation_alignment_worker,
-        args=(child_conn, input_dir, output_dir)
-    )
-    process.start()
-    
-    # Monitor progress
-    result = None
-    while process.is_alive():
-        if parent_conn.poll(0.1):  # Check for messages with timeout
-            msg_type, msg_data = parent_conn.recv()
+    global _worker
+    # The worker runs one job at a time
+    with _job_lock:
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                _worker = _PersistentWorker()
+            worker = _worker
+        
+        completed = False
+        try:
+            worker.conn.send((input_dir, output_dir, half_precision))
             
-            if msg_type == 'progress' and progress_callback:
-                progress_callback(msg_data)
-            elif msg_type == 'finished':
-                result = msg_data
-            elif msg_type == 'error':
-                raise Exception(msg_data)
-    
-    # Clean up
-    process.join()
-    parent_conn.close()
-    
-    return result 
\ No newline at end of file
+            # Monitor progress, blocking until a message arrives or the process exits
+            while True:
+                ready = wait([worker.conn, worker.process.sentinel])
+                if worker.conn in ready:
+                    try:
+                        msg_type, msg_data = worker.conn.recv()
+                    except EOFError:
+                        break
+                    
+                    if msg_type == 'progress' and progress_callback:
+                        # Progress arrives in newline-joined batches
+                        for line in msg_data.split('\n'):
+                            progress_callback(line)
+                    elif msg_type == 'finished':
+                        completed = True
+                        return msg_data
+                    elif msg_type == 'error':
+                        completed = True
+                        raise Exception(msg_data)
+                elif not worker.conn.poll():
+                    # Process exited with nothing left to read
+                    break
+            
+            worker.process.join()
+            raise Exception(f"Worker process exited unexpectedly (exit code {worker.process.exitcode})")
+        finally:
+            if not completed:
+                # The worker died, or we stopped reading early (e.g. progress_callback raised)
+                # and the rest of this job's messages would be taken for the next job's
+                _discard_worker(worker)
@@ -1,14 +1,22 @@
+import os
 import json
 from pathlib import Path
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, ElementTree, indent
 import re
+import numpy as np
+
+# orjson parses large alignment files several times faster; json.loads also accepts UTF-8 bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 def load_alignment_data(alignment_file_path):
     """Load alignment data from JSON file"""
     try:
-        with open(alignment_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(alignment_file_path, 'rb') as f:
+            data = _json_loads(f.read())
         return data
     except Exception as e:
         print(f"Error loading alignment data: {e}")
@@ -21,124 +29,129 @@ def format_time_for_ttml(seconds):
     secs = seconds % 60
     return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
 
-def group_words_into_lines(words):
-    """Group words into lines based on line_end markers or timing gaps"""
-    lines = []
-    current_line = []
+def normalize_words(words):
+    """Flatten alignment word dicts into (text, start, end, line_end) tuples.
     
-    for word in words:
-        current_line.append(word)
-        
-        # Check if this word ends a line
-        if word.get('line_end', False):
-            lines.append(current_line)
-            current_line = []
-    
-    # Add any remaining words as the last line
-    if current_line:
-        lines.append(current_line)
+    Handles both 'word'/'text' and 'begin'/'start' key variants once up front;
+    end is None when the word has no end time.
+    """
+    return [
+        (
+            word.get('word', word.get('text', '')).strip(),
+            word.get('begin', word.get('start', 0)),
+            word.get('end'),
+            bool(word.get('line_end', False))
+        )
+        for word in words
+    ]
+
+def group_words_into_lines(words):
+    """Group normalized word tuples into lines based on line_end markers"""
+    # Lines end after each flagged word; a trailing unflagged run forms the last line
+    flags = np.fromiter((word[3] for word in words), dtype=bool, count=len(words))
+    ends = (np.flatnonzero(flags) + 1).tolist()
+    if not ends or ends[-1] != len(words):
+        ends.append(len(words))
+    starts = [0] + ends[:-1]
+    return [words[start:end] for start, end in zip(starts, ends) if start < end]
+
+def pregrouped_lines(alignment_data):
+    """Return line dicts for alignment data that is already grouped into lines, else None
     
+    Lines are shallow copies so callers can annotate them without touching the
+    loaded data. Each gets a 'text' if it lacks one, and words keyed 'word'
+    get a copy that also carries 'text'.
+    """
+    if not (alignment_data and 'words' in alignment_data[0] and
+            'start' in alignment_data[0] and 'end' in alignment_data[0]):
+        return None
+    lines = []
+    for line in alignment_data:
+        words = [word if 'text' in word else {**word, 'text': word.get('word', '')} for word in line['words']]
+        line = {**line, 'words': words}
+        line.setdefault('text', ' '.join(word['text'] for word in words))
+        lines.append(line)
     return lines
 
 def create_karaoke_line_subtitles(line_words, line_idx):
-    """Create karaoke-style subtitles for a single line with word-by-word color changes"""
+    """Create karaoke-style subtitle timings for a single line, one entry per word.
+    
+    Each entry is a (start_time, end_time, word_idx, line_id) tuple where word_idx
+    is the word being sung; words before it are sung and words after it are not yet sung.
+    """
     subtitle_entries = []
     
     if not line_words:
         return subtitle_entries
     
-    # For each word in the line, create a subtitle entry
-    for word_idx, current_word in enumerate(line_words):
-        word_start = current_word.get('begin', current_word.get('start', 0))
-        
+    last_idx = len(line_words) - 1
+    for word_idx, (_, word_start, end, _) in enumerate(line_words):
         # Determine when this word's subtitle should end
-        if word_idx < len(line_words) - 1:
+        if word_idx < last_idx:
             # Not the last word - end when the next word begins
-            next_word = line_words[word_idx + 1]
-            word_end = next_word.get('begin', next_word.get('start', word_start + 0.5))
+            word_end = line_words[word_idx + 1][1]
         else:
             # Last word in line - end when the word actually ends
-            word_end = current_word.get('end', current_word.get('end', word_start + 0.5))
+            word_end = end if end is not None else word_start + 0.5
         
-        # Create the line text with different colors for sung/unsung words
-        line_parts = []
-        for i, word in enumerate(line_words):
-            word_text = word.get('word', word.get('text', '')).strip()
-            if not word_text:
-                continue
-                
-            if i < word_idx:
-                # Already sung words - green color
-                line_parts.append(f'<span tts:color="lime">{word_text}</span>')
-            elif i == word_idx:
-                # Currently singing word - yellow color
-                line_parts.append(f'<span tts:color="yellow">{word_text}</span>')
-            else:
-                # Not yet sung words - white color
-                line_parts.append(f'<span tts:color="white">{word_text}</span>')
-        
-        # Create subtitle entry for this word timing
-        entry = {
-            'start_time': word_start,
-            'end_time': word_end,
-            'text': ' '.join(line_parts),
-            'line_id': line_idx
-        }
-        subtitle_entries.append(entry)
+        subtitle_entries.append((word_start, word_end, word_idx, line_idx))
     
     return subtitle_entries
 
-def create_ttml_karaoke_subtitle(words, song_title="", artist=""):
-    """Create karaoke-style TTML subtitle content with word-by-word color changes"""
+# TTML header styles as (xml:id, attributes) pairs
+TTML_STYLES = (
+    ('defaultStyle', {
+        'tts:fontFamily': 'Arial, sans-serif',
+        'tts:fontSize': '24px',
+        'tts:color': 'white',
+        'tts:textAlign': 'center'
+    }),
+)
+
+KARAOKE_TTML_STYLES = (
+    ('baseStyle', {
+        'tts:fontFamily': 'Arial, sans-serif',
+        'tts:fontSize': '28px',
+        'tts:fontWeight': 'bold',
+        'tts:textAlign': 'center',
+        'tts:padding': '10px'
+    }),
+    ('sungStyle', {'tts:color': 'lime'}),  # Already sung
+    ('currentStyle', {'tts:color': 'yellow'}),  # Currently singing
+    ('unsungStyle', {'tts:color': 'white'}),  # Not yet sung
+)
+
+def _build_ttml_skeleton(song_title, artist, styles, div_style):
+    """Build the tt/head/body scaffold shared by both TTML styles, returning (tt, div)"""
     # Create root TTML element
-    tt = Element('tt')
-    tt.set('xmlns', 'http://www.w3.org/ns/ttml')
-    tt.set('xmlns:tts', 'http://www.w3.org/ns/ttml#styling')
-    tt.set('xml:lang', 'en')
+    tt = Element('tt', {
+        'xmlns': 'http://www.w3.org/ns/ttml',
+        'xmlns:tts': 'http://www.w3.org/ns/ttml#styling',
+        'xml:lang': 'en'
+    })
     
     # Head section with metadata and styling
     head = SubElement(tt, 'head')
-    
-    # Metadata
     metadata = SubElement(head, 'metadata')
     if song_title:
-        title = SubElement(metadata, 'title')
-        title.text = song_title
+        SubElement(metadata, 'title').text = song_title
     if artist:
-        creator = SubElement(metadata, 'creator')
-        creator.text = artist
-    
-    # Styling
+        SubElement(metadata, 'creator').text = artist
     styling = SubElement(head, 'styling')
-    
-    # Base style
-    base_style = SubElement(styling, 'style')
-    base_style.set('xml:id', 'baseStyle')
-    base_style.set('tts:fontFamily', 'Arial, sans-serif')
-    base_style.set('tts:fontSize', '28px')
-    base_style.set('tts:fontWeight', 'bold')
-    base_style.set('tts:textAlign', 'center')
-    base_style.set('tts:padding', '10px')
-    
-    # Sung word style
-    sung_style = SubElement(styling, 'style')
-    sung_style.set('xml:id', 'sungStyle')
-    sung_style.set('tts:color', 'lime')
-    
-    # Current word style  
-    current_style = SubElement(styling, 'style')
-    current_style.set('xml:id', 'currentStyle')
-    current_style.set('tts:color', 'yellow')
-    
-    # Unsung word style
-    unsung_style = SubElement(styling, 'style')
-    unsung_style.set('xml:id', 'unsungStyle')
-    unsung_style.set('tts:color', 'white')
+    for style_id, attributes in styles:
+        SubElement(styling, 'style', {'xml:id': style_id, **attributes})
     
     # Body section
     body = SubElement(tt, 'body')
-    div = SubElement(body, 'div')
-    div.set('style', 'baseStyle')
+    div = SubElement(body, 'div', {'style': div_style})
+    return tt, div
+
+def create_ttml_karaoke_subtitle(words, song_title="", artist=""):
+    """Create karaoke-style TTML subtitle content with word-by-word color changes
+    
+    words is a list of normalized tuples from normalize_words.
+    """
+    tt, div = _build_ttml_skeleton(song_title, artist, KARAOKE_TTML_STYLES, 'baseStyle')
     
     # Group words into lines
     lines = group_words_into_lines(words)
@@ -147,74 +160,43 @@ def create_ttml_karaoke_subtitle(words, song_title="", artist=""):
     for line_idx, line_words in enumerate(lines):
         karaoke_entries = create_karaoke_line_subtitles(line_words, line_idx)
         
+        # Word texts are the same for every paragraph of this line
+        word_texts = [word[0] for word in line_words]
+        last_idx = len(word_texts) - 1
+        
         # Add each karaoke entry as a paragraph
-        for entry_idx, entry in enumerate(karaoke_entries):
+        for start_time, end_time, current_word_idx, _ in karaoke_entries:
             p = SubElement(div, 'p')
-            p.set('begin', format_time_for_ttml(entry['start_time']))
-            p.set('end', format_time_for_ttml(entry['end_time']))
-            
-            # Create spans directly instead of parsing HTML-like text
-            line_words = lines[entry['line_id']]
-            current_word_idx = entry_idx  # This is the word currently being sung
+            p.set('begin', format_time_for_ttml(start_time))
+            p.set('end', format_time_for_ttml(end_time))
             
             # Build the paragraph with proper spans
-            for i, word in enumerate(line_words):
-                word_text = word.get('word', word.get('text', '')).strip()
+            for i, word_text in enumerate(word_texts):
                 if not word_text:
                     continue
                 
                 # Create span for this word
                 span = SubElement(p, 'span')
                 
-                # Set color based on word position
+                # Reference the header style for the word's position
                 if i < current_word_idx:
-                    span.set('tts:color', 'lime')  # Already sung
+                    span.set('style', 'sungStyle')  # Already sung
                 elif i == current_word_idx:
-                    span.set('tts:color', 'yellow')  # Currently singing
+                    span.set('style', 'currentStyle')  # Currently singing
                 else:
-                    span.set('tts:color', 'white')  # Not yet sung
+                    span.set('style', 'unsungStyle')  # Not yet sung
                     
                 span.text = word_text
                 
                 # Add space after word (except last word)
-                if i < len(line_words) - 1:
+                if i < last_idx:
                     span.tail = ' '
     
     return tt
 
 def create_ttml_subtitle(words, song_title="", artist=""):
-    """Create TTML subtitle content from word timing data"""
-    # Create root TTML element
-    tt = Element('tt')
-    tt.set('xmlns', 'http://www.w3.org/ns/ttml')
-    tt.set('xmlns:tts', 'http://www.w3.org/ns/ttml#styling')
-    tt.set('xml:lang', 'en')
-    
-    # Head section with metadata and styling
-    head = SubElement(tt, 'head')
-    
-    # Metadata
-    metadata = SubElement(head, 'metadata')
-    if song_title:
-        title = SubElement(metadata, 'title')
-        title.text = song_title
-    if artist:
-        creator = SubElement(metadata, 'creator')
-        creator.text = artist
-    
-    # Styling
-    styling = SubElement(head, 'styling')
-    style = SubElement(styling, 'style')
-    style.set('xml:id', 'defaultStyle')
-    style.set('tts:fontFamily', 'Arial, sans-serif')
-    style.set('tts:fontSize', '24px')
-    style.set('tts:color', 'white')
-    style.set('tts:textAlign', 'center')
-    
-    # Body section
-    body = SubElement(tt, 'body')
-    div = SubElement(body, 'div')
-    div.set('style', 'defaultStyle')
+    """Create TTML subtitle content from normalized word tuples"""
+    tt, div = _build_ttml_skeleton(song_title, artist, TTML_STYLES, 'defaultStyle')
     
     # Group words into lines
     lines = group_words_into_lines(words)
@@ -225,8 +207,10 @@ def create_ttml_subtitle(words, song_title="", artist=""):
             continue
             
         # Get timing for the entire line
-        start_time = line_words[0].get('begin', line_words[0].get('start', 0))
-        end_time = line_words[-1].get('end', line_words[-1].get('end', start_time + 1))
+        start_time = line_words[0][1]
+        end_time = line_words[-1][2]
+        if end_time is None:
+            end_time = start_time + 1
         
         # Create paragraph element
         p = SubElement(div, 'p')
@@ -234,14 +218,8 @@ def create_ttml_subtitle(words, song_title="", artist=""):
         p.set('end', format_time_for_ttml(end_time))
         
         # Add words to the line with individual timing
-        line_text_parts = []
-        for word in line_words:
-            word_text = word.get('word', word.get('text', '')).strip()
-            if word_text:
-                line_text_parts.append(word_text)
-        
         # Set the text content
-        p.text = ' '.join(line_text_parts)
+        p.text = ' '.join(word[0] for word in line_words if word[0])
     
     return tt
 
@@ -270,24 +248,18 @@ def export_ttml_subtitle(alignment_file_path, output_path, song_title="", artist
             print("No word data found in alignment file")
             return False
         
+        # Normalize key variants once so the builders work on plain tuples
+        words = normalize_words(words)
+        
         # Create TTML content - choose between karaoke and regular style
         if karaoke_style:
             ttml_root = create_ttml_karaoke_subtitle(words, song_title, artist)
         else:
             ttml_root = create_ttml_subtitle(words, song_title, artist)
         
-        # Convert to pretty-printed XML string
-        rough_string = tostring(ttml_root, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        pretty_xml = reparsed.toprettyxml(indent="  ")
-        
-        # Remove empty lines and fix XML declaration
-        lines = [line for line in pretty_xml.split('\n') if line.strip()]
-        pretty_xml = '\n'.join(lines)
-        
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(pretty_xml)
+        # Pretty-print in place and write straight to file
+        indent(ttml_root, space="  ")
+        ElementTree(ttml_root).write(output_path, encoding='utf-8', xml_declaration=True)
         
         style_type = "karaoke-style" if karaoke_style else "regular"
         print(f"TTML {style_type} subtitle exported successfully: {output_path}")
@@ -301,14 +273,17 @@ def export_subtitle_from_project(project_dir, song_title="", artist="", karaoke_
     """Export subtitle from a project directory"""
     project_path = Path(project_dir)
     
-    # Find alignment file
-    alignment_file = None
-    for file in project_path.iterdir():
-        if file.name.endswith('project.json'):
-            alignment_file = str(file)
-            break
-        if file.name.endswith('lyrics_alignment.json'):
-            alignment_file = str(file)
+    # Find alignment file in a single directory pass; the edited project file wins
+    project_json_file = None
+    lyrics_alignment_file = None
+    with os.scandir(project_path) as entries:
+        for entry in entries:
+            if entry.name.endswith('project.json'):
+                project_json_file = entry.path
+                break
+            if entry.name.endswith('lyrics_alignment.json'):
+                lyrics_alignment_file = entry.path
+    alignment_file = project_json_file or lyrics_alignment_file
             
     if not alignment_file:
         print("No alignment file found in project")
@@ -1,9 +1,38 @@
 import os
+import sys
+import re
 import json
+import bisect
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 import dotenv
 import aubio
+from subtitle_generator import pregrouped_lines
+
+# orjson parses large alignment files several times faster; json.loads also accepts UTF-8 bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson, when installed, lets test_alignment read word timings without holding the whole document
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# PyAV, when installed, lets frames go straight into libx264 instead of through a pipe to ffmpeg
+try:
+    import av
+except ImportError:
+    av = None
+
 dotenv.load_dotenv(dotenv_path='.env')
 
 # Load font configurations from environment variables
@@ -11,6 +40,8 @@ FONT_NAME = os.getenv('FONT_NAME', 'Cascadia-Mono-Regular')
 FONT_COLOR_ACTIVE = os.getenv('FONT_COLOR_ACTIVE', 'yellow')
 FONT_COLOR_INACTIVE = os.getenv('FONT_COLOR_INACTIVE', 'white')
 FONT_KERNING = int(os.getenv('FONT_KERNING', '1'))
+# Optional .ttf/.otf path; lets test renders draw words with Pillow instead of ImageMagick
+FONT_FILE = os.getenv('FONT_FILE', None)
 
 image_magick_path = os.getenv('IMAGEMAGICK_BINARY', None)
 print(f"ImageMagick path: {image_magick_path}")
@@ -18,7 +49,7 @@ print(f"Font configuration: {FONT_NAME}, kerning={FONT_KERNING}")
 print(f"Colors: active={FONT_COLOR_ACTIVE}, inactive={FONT_COLOR_INACTIVE}")
 
 from moviepy.config import change_settings
-from moviepy.editor import ColorClip, TextClip, CompositeVideoClip, AudioFileClip, VideoClip, concatenate_videoclips
+from moviepy.editor import ColorClip, TextClip, CompositeVideoClip, AudioFileClip, VideoClip
 
 if image_magick_path:
     print(f"Setting ImageMagick path to: {image_magick_path}")
@@ -26,9 +57,435 @@ if image_magick_path:
 
 
 
+class _ClipCache:
+    """
+    Thread-safe least-recently-used cache of clips, bounded both by entry count
+    and by the bytes their bitmaps (and masks) hold. Line bitmaps at 720p and up
+    run to megabytes each once their float masks are counted, so a count alone
+    would let a long GUI session or batch run hold gigabytes.
+    """
+    def __init__(self, max_entries, max_bytes):
+        self.entries = OrderedDict()  # key -> (clip, nbytes)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.lock = threading.Lock()
+    
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+    
+    def get(self, key):
+        """Return the cached clip for key (marking it recently used), or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, clip):
+        """Add a clip, evicting the least recently used entries past either limit"""
+        nbytes = _clip_nbytes(clip)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self.entries[key] = (clip, nbytes)
+            self.nbytes += nbytes
+            while len(self.entries) > self.max_entries or (self.nbytes > self.max_bytes and len(self.entries) > 1):
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.nbytes -= evicted_bytes
+
+def _clip_nbytes(clip):
+    """Bytes held by an image clip's bitmap and its mask's bitmap"""
+    nbytes = 0
+    for image_clip in (clip, getattr(clip, 'mask', None)):
+        img = getattr(image_clip, 'img', None)
+        if img is not None:
+            nbytes += img.nbytes
+    return nbytes
+
+
+# Rendered TextClips keyed by text and style. Clip setters (set_start, set_mask,
+# fadein, ...) return copies, so a cached clip can be handed out repeatedly
+# without ImageMagick rasterizing the same text again. The lock inside the cache
+# covers concurrent batch renders.
+_TEXTCLIP_CACHE = _ClipCache(max_entries=2048, max_bytes=1024 * 1024 * 1024)
+# Float mask conversions of renders, kept apart so they never evict renders still to be used
+_TEXTMASK_CACHE = _ClipCache(max_entries=512, max_bytes=256 * 1024 * 1024)
+
+def _textclip_key(text, kwargs):
+    return (text, tuple(sorted(kwargs.items())))
+
+def _cached_textclip(text, **kwargs):
+    """Return a TextClip for text and style, reusing an earlier render when possible"""
+    key = _textclip_key(text, kwargs)
+    clip = _TEXTCLIP_CACHE.get(key)
+    if clip is None:
+        clip = TextClip(text, **kwargs)
+        _TEXTCLIP_CACHE.put(key, clip)
+    return clip
+
+# Words of a line's display text, and the characters a mask blanks out
+_WORD_PATTERN = re.compile(r'\S+')
+_NON_SPACE_PATTERN = re.compile(r'\S')
+
+def _word_offsets(text):
+    """Start offset of each whitespace-separated word in text"""
+    return [match.start() for match in _WORD_PATTERN.finditer(text)]
+
+def _cached_textmask(text, **kwargs):
+    """Return _cached_textclip(text, **kwargs).to_mask(), reusing an earlier conversion"""
+    # to_mask converts the whole bitmap to floats, so keep the result for repeated lines
+    key = _textclip_key(text, kwargs)
+    mask = _TEXTMASK_CACHE.get(key)
+    if mask is None:
+        mask = _cached_textclip(text, **kwargs).to_mask()
+        _TEXTMASK_CACHE.put(key, mask)
+    return mask
+
+def _try_textclip(spec):
+    """Render a (text, kwargs) spec, returning None instead of raising if ImageMagick fails"""
+    try:
+        return TextClip(spec[0], **spec[1])
+    except Exception:
+        return None
+
+def _prerender_textclips(specs, workers):
+    """Fill the TextClip cache for (text, kwargs) specs using a pool of threads.
+    
+    Each TextClip waits on an ImageMagick subprocess, so threads render
+    several at once without fighting over the GIL. Specs are stored in order
+    until the cache could not take more without evicting this batch's own
+    renders; the rest are rendered on demand when they are reached. A spec
+    that fails to render is left uncached, so the on-demand path meets the
+    same error inside the caller's own per-line or per-word error handling.
+    """
+    pending = {}
+    for text, kwargs in specs:
+        key = _textclip_key(text, kwargs)
+        if key not in _TEXTCLIP_CACHE:
+            pending[key] = (text, kwargs)
+    if not pending:
+        return
+    if len(pending) > _TEXTCLIP_CACHE.max_entries:
+        pending = dict(list(pending.items())[:_TEXTCLIP_CACHE.max_entries])
+    print(f"Pre-rendering {len(pending)} text clips with {workers} workers...")
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        stored_bytes = 0
+        rendered = pool.map(_try_textclip, pending.values())
+        for key, clip in zip(pending, rendered):
+            if clip is None:
+                continue
+            stored_bytes += _clip_nbytes(clip)
+            if stored_bytes > _TEXTCLIP_CACHE.max_bytes:
+                break
+            _TEXTCLIP_CACHE.put(key, clip)
+    finally:
+        # Skip renders that were queued but will not be stored
+        pool.shutdown(cancel_futures=True)
+
+
+# Encoder settings per codec: (preset, extra ffmpeg params). Every codec gets
+# 4:2:0 output that browsers and players decode natively; hardware encoders use
+# a 2 second GOP at 24 fps.
+_COMMON_VIDEO_PARAMS = ['-pix_fmt', 'yuv420p']
+_CODEC_SETTINGS = {
+    # Fastest NVENC preset with the low-latency tune: text on black needs no lookahead
+    'h264_nvenc': ('p1', ['-tune', 'll', '-rc', 'vbr', '-cq', '23', '-g', '48'] + _COMMON_VIDEO_PARAMS),
+    'h264_amf': ('speed', ['-rc', 'cqp', '-qp_i', '23', '-qp_p', '23', '-g', '48'] + _COMMON_VIDEO_PARAMS),
+    'h264_videotoolbox': ('medium', ['-b:v', '4M', '-g', '48'] + _COMMON_VIDEO_PARAMS),
+    # Frames only change at word boundaries, which suits the stillimage tune and
+    # a long 10 second keyframe interval: static spans cost almost nothing
+    'libx264': ('ultrafast', ['-tune', 'stillimage', '-crf', '23', '-g', '240'] + _COMMON_VIDEO_PARAMS),
+}
+_VIDEO_CODEC = None
+
+def _pick_video_codec():
+    """Return a hardware H.264 encoder that works on this machine, else libx264 (probed once)"""
+    global _VIDEO_CODEC
+    if _VIDEO_CODEC is None:
+        from moviepy.config import get_setting
+        ffmpeg_binary = get_setting("FFMPEG_BINARY")
+        candidates = ['h264_videotoolbox'] if sys.platform == 'darwin' else ['h264_nvenc', 'h264_amf']
+        _VIDEO_CODEC = 'libx264'
+        for codec in candidates:
+            # ffmpeg often lists NVENC/AMF without a usable GPU, so try a tiny encode instead of -encoders
+            try:
+                result = subprocess.run(
+                    [ffmpeg_binary, '-hide_banner', '-loglevel', 'error',
+                     '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+                     '-c:v', codec, '-f', 'null', '-'],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=15)
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+            if result.returncode == 0:
+                _VIDEO_CODEC = codec
+                break
+        print(f"Video encoder: {_VIDEO_CODEC}")
+    return _VIDEO_CODEC
+
+
+# Containers that may already hold AAC, which is copied through instead of re-encoded
+_MP4_AUDIO_EXTENSIONS = ('.m4a', '.aac', '.mp4')
+
+def _probe_audio_codec(path):
+    """Return the codec name of the first audio stream in path, or None if ffprobe can't tell"""
+    try:
+        out = subprocess.check_output(
+            ['ffprobe', '-v', 'quiet', '-select_streams', 'a:0', '-show_entries', 'stream=codec_name',
+             '-of', 'csv=p=0', path],
+            stderr=subprocess.DEVNULL, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.strip() or None
+
+def _mux_audio(video_path, audio_path, output_path, audio_offset=0):
+    """Copy the video stream and add audio_path (delayed by audio_offset seconds) into output_path.
+    
+    AAC sources are stream-copied; anything else (e.g. the separated WAV stems, or
+    ALAC in an .m4a) is encoded to AAC. The moov atom is moved to the front so the result can start
+    playing while it streams.
+    """
+    from moviepy.config import get_setting
+    # Only probe files whose container can hold AAC; the WAV stems are always encoded
+    if (os.path.splitext(audio_path)[1].lower() in _MP4_AUDIO_EXTENSIONS and
+            _probe_audio_codec(audio_path) == 'aac'):
+        audio_codec = ['-c:a', 'copy']
+    else:
+        audio_codec = ['-c:a', 'aac', '-b:a', '192k']
+    cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', '-i', video_path]
+    if audio_offset:
+        cmd += ['-itsoffset', str(audio_offset)]
+    cmd += ['-i', audio_path,
+            '-map', '0:v:0', '-map', '1:a:0',
+            '-c:v', 'copy'] + audio_codec + [
+            '-movflags', '+faststart', '-shortest', output_path]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to add audio:\n{result.stderr}")
+
+
+def _probe_duration(path):
+    """Return the duration of a media file in seconds, read from its header with ffprobe"""
+    try:
+        out = subprocess.check_output(
+            ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            stderr=subprocess.DEVNULL)
+        return float(out)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        # No ffprobe next to MoviePy's bundled ffmpeg (or an unreadable header): open the file instead
+        audio = AudioFileClip(path)
+        duration = audio.duration
+        audio.close()
+        return duration
+
+
+def _frame_count(duration, fps):
+    """Number of frames MoviePy's write_videofile produces for duration at fps"""
+    return len(np.arange(0, duration, 1.0 / fps))
+
+
+def _encode_frames_pyav(make_frame, duration, size, output_path, fps=24, threads=0, frame_range=None, output_size=None,
+                        preset='ultrafast'):
+    """Encode the RGB frames of make_frame(t) to a silent H.264 MP4 in-process with PyAV.
+    
+    preset is the x264 preset name. frame_range (first, stop) limits the output to those frame indices of the full timeline.
+    output_size, when it differs from size, has swscale resize each frame (Lanczos) before encoding.
+    """
+    width, height = output_size or size
+    first, stop = frame_range or (0, _frame_count(duration, fps))
+    with av.open(output_path, 'w') as container:
+        stream = container.add_stream('libx264', rate=fps,
+                                      options={'preset': preset, 'tune': 'stillimage', 'crf': '23', 'g': '240'})
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = 'yuv420p'
+        stream.codec_context.thread_count = threads
+        image = frame = None
+        for index in range(first, stop):
+            next_image = make_frame(index / fps)
+            # Runs of identical frames (make_frame returned the same array) skip the conversion
+            if next_image is not image:
+                image = next_image
+                frame = av.VideoFrame.from_ndarray(image, format='rgb24')
+                if (frame.width, frame.height) != (width, height):
+                    frame = frame.reformat(width=width, height=height, format='yuv420p', interpolation='LANCZOS')
+            frame.pts = index - first
+            container.mux(stream.encode(frame))
+        # Flush frames still buffered in the encoder
+        container.mux(stream.encode())
+
+
+def _encode_chunk(args):
+    """Process pool entry point: encode one frame range with _encode_frames_pyav"""
+    make_frame, duration, size, output_path, fps, threads, frame_range, output_size, preset = args
+    _encode_frames_pyav(make_frame, duration, size, output_path, fps, threads, frame_range, output_size, preset)
+    return output_path
+
+
+def _encode_frames_parallel(make_frame, duration, size, output_path, fps=24, threads=0, min_chunk_seconds=10, output_size=None,
+                            preset='ultrafast'):
+    """
+    Encode make_frame(t) with PyAV in one process per chunk of the timeline, then
+    join the chunks with ffmpeg's concat demuxer (stream copy, no re-encode).
+    make_frame must be picklable. Two cores are left free for the OS and the parent.
+    """
+    total_frames = _frame_count(duration, fps)
+    chunks = max(1, min((os.cpu_count() or 1) - 2, int(duration // min_chunk_seconds)))
+    if chunks == 1:
+        _encode_frames_pyav(make_frame, duration, size, output_path, fps, threads, output_size=output_size, preset=preset)
+        return
+    
+    bounds = [total_frames * i // chunks for i in range(chunks + 1)]
+    base, _ = os.path.splitext(output_path)
+    chunk_paths = [f"{base}.part{i}.mp4" for i in range(chunks)]
+    list_path = f"{base}.parts.txt"
+    print(f"Encoding {total_frames} frames in {chunks} parallel chunks...")
+    try:
+        jobs = [(make_frame, duration, size, chunk_path, fps, max(1, (threads or 1) // chunks), (bounds[i], bounds[i + 1]), output_size, preset)
+                for i, chunk_path in enumerate(chunk_paths)]
+        with ProcessPoolExecutor(max_workers=chunks) as pool:
+            list(pool.map(_encode_chunk, jobs))
+        
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for chunk_path in chunk_paths:
+                escaped = os.path.abspath(chunk_path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        from moviepy.config import get_setting
+        result = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+             '-i', list_path, '-c', 'copy', output_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to join video chunks:\n{result.stderr}")
+    finally:
+        for path in chunk_paths + [list_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class _WordFrames:
+    """
+    make_frame for test_alignment: shows the latest-starting word on screen at t
+    (the top layer of an equivalent composite) centered on black. Word bitmaps
+    are already blended onto black, so a frame is a plain copy with no alpha
+    math. A plain class rather than a closure so encoder worker processes can
+    unpickle it.
+    """
+    
+    def __init__(self, starts, ends, texts, word_bitmaps, size, duration, fps=24):
+        self.texts = texts
+        self.word_bitmaps = word_bitmaps  # text -> (bitmap, y, x)
+        self.size = size
+        self.fps = fps
+        # Which word is on screen for every frame of the timeline (-1: none), worked out
+        # once so a frame is a table lookup. Words are painted in start order so the
+        # latest-starting one wins where they overlap; frame k at t = k / fps shows a
+        # word when start <= t < end.
+        frame_starts = np.ceil(np.asarray(starts) * fps).astype(np.int64)
+        frame_ends = np.ceil(np.asarray(ends) * fps).astype(np.int64)
+        self.frame_words = np.full(_frame_count(duration, fps), -1, dtype=np.int32)
+        for i in np.argsort(frame_starts, kind='stable').tolist():
+            self.frame_words[frame_starts[i]:frame_ends[i]] = i
+        # The picture only changes when the word on screen does, so consecutive
+        # frames of the same word share one array instead of being redrawn
+        self.shown_text = None
+        # Every gap between words returns this one read-only frame
+        self.black_frame = self._blank()
+        self.black_frame.flags.writeable = False
+        self.shown_frame = self.black_frame
+    
+    def _blank(self):
+        width, height = self.size
+        return np.zeros((height, width, 3), dtype=np.uint8)
+    
+    def __call__(self, t):
+        k = int(round(t * self.fps))
+        i = self.frame_words[k] if 0 <= k < len(self.frame_words) else -1
+        text = self.texts[i] if i >= 0 else None
+        if text != self.shown_text:
+            self.shown_text = text
+            if text is None:
+                self.shown_frame = self.black_frame
+            else:
+                bitmap, y, x = self.word_bitmaps[text]
+                self.shown_frame = self._blank()
+                self.shown_frame[y:y + bitmap.shape[0], x:x + bitmap.shape[1]] = bitmap
+        return self.shown_frame
+
+
+class _RevealMask:
+    """
+    Mask make_frame for a karaoke line's yellow text: at time t (relative to the
+    first word) it returns the progressive mask of the furthest word started so
+    far. Each word's mask already reveals every earlier word, so one masked layer
+    shows what a stack of one yellow layer per word would.
+    """
+    def __init__(self, starts, masks):
+        # Sort by start; an out-of-order word never hides words already revealed
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        self.starts = [starts[i] for i in order]
+        self.masks = []
+        furthest = 0
+        for i in order:
+            furthest = max(furthest, i)
+            self.masks.append(masks[furthest])
+    
+    def __call__(self, t):
+        index = bisect.bisect_right(self.starts, t) - 1
+        return self.masks[max(index, 0)]
+
+
+class _IndexedCompositeVideoClip(CompositeVideoClip):
+    """
+    CompositeVideoClip that finds the layers playing at time t by bisecting on
+    start times instead of testing every layer on every frame. Karaoke videos
+    have hundreds of short line clips but only one or two are visible at once.
+    """
+    
+    LONG_CLIP = 30.0  # Clips longer than this (intros, breaks) are always tested
+    
+    def __init__(self, clips, **kwargs):
+        super().__init__(clips, **kwargs)
+        short = []
+        self._long_layers = []
+        for layer, clip in enumerate(self.clips):
+            if clip.end is None or clip.end - clip.start > self.LONG_CLIP:
+                self._long_layers.append(layer)
+            else:
+                short.append((clip.start, layer))
+        short.sort()
+        self._starts = [start for start, _ in short]
+        self._start_layers = [layer for _, layer in short]
+        
+    def playing_clips(self, t=0):
+        # Only short clips that started within LONG_CLIP seconds of t can be playing
+        lo = bisect.bisect_left(self._starts, t - self.LONG_CLIP)
+        hi = bisect.bisect_right(self._starts, t)
+        layers = [layer for layer in self._start_layers[lo:hi] if self.clips[layer].is_playing(t)]
+        layers.extend(layer for layer in self._long_layers if self.clips[layer].is_playing(t))
+        # Blit in the original layer order
+        layers.sort()
+        return [self.clips[layer] for layer in layers]
+
+
 class KaraokeVideoGenerator:
-    def __init__(self, output_dir, resolution="1280x720"):
+    def __init__(self, output_dir, resolution="1280x720", threads=None, verbose=True, use_gpu=True, preset='ultrafast',
+                 codec='auto'):
         self.output_dir = output_dir
+        # 'auto' picks hardware H.264 (NVENC/AMF/VideoToolbox) when the machine has a working one
+        # and use_gpu is set, else libx264; any other value is passed to ffmpeg as-is
+        self.codec = codec
+        self.use_gpu = use_gpu
+        # x264 preset for software encodes; 'veryfast' or slower trades encode time for smaller files
+        self.preset = preset
+        # Per-line and per-word diagnostics; off skips formatting them entirely
+        self.verbose = verbose
+        # ffmpeg does not use every core on its own; default to all of them
+        self.threads = threads or os.cpu_count() or 4
         
         # Parse resolution and ensure 16:9 aspect ratio
         if isinstance(resolution, str):
@@ -69,7 +526,7 @@ class KaraokeVideoGenerator:
         print(f"Font size: {self.font_size}, Text width: {self.text_width}")
         print(f"Y positions: top={self.y_top}, bottom={self.y_bottom}")
         
-    def generate(self, instrumental_path, alignment_path, output_name, use_wipe=True, song_title="", artist=""):
+    def generate(self, instrumental_path, alignment_path, output_name, use_wipe=True, song_title="", artist="", use_ffmpeg_direct=False):
         """
         Generate karaoke video with timed lyrics in karaoke style
         
@@ -80,22 +537,31 @@ class KaraokeVideoGenerator:
             use_wipe (bool): Whether to use wipe transitions instead of progressive highlighting
             song_title (str): Title of the song (for intro)
             artist (str): Artist of the song (for intro)
+            use_ffmpeg_direct (bool): Render with ffmpeg/libass (ass_video_generator) instead of
+                compositing every frame in Python
             
         Returns:
             str: Path to the generated video file
         """
+        if use_ffmpeg_direct:
+            # The ASS renderer draws the same karaoke layout with libass inside ffmpeg
+            from ass_video_generator import KaraokeVideoGenerator as AssVideoGenerator
+            ass_generator = AssVideoGenerator(self.output_dir, self.resolution, self.threads)
+            return ass_generator.generate(instrumental_path, alignment_path, output_name, use_wipe,
+                                          song_title=song_title, artist=artist)
+        
         print(f"Loading alignment data from: {alignment_path}")
         
         # Load alignment data
-        with open(alignment_path, 'r', encoding='utf-8') as f:
-            alignment_data = json.load(f)
+        with open(alignment_path, 'rb') as f:
+            alignment_data = _json_loads(f.read())
             
         print(f"Loaded {len(alignment_data)} word alignments")
         
         # Load audio and detect BPM
         print(f"Loading audio from: {instrumental_path}")
-        audio = AudioFileClip(instrumental_path)
-        duration = audio.duration
+        # Only the duration is needed; ffmpeg muxes the audio itself after the frames are written
+        duration = audio_duration = _probe_duration(instrumental_path)
         print(f"Audio duration: {duration:.2f} seconds")
         
         # Detect BPM and beats using aubio
@@ -131,39 +597,47 @@ class KaraokeVideoGenerator:
         # Create karaoke line clips
         line_clips = []
         
+        # Choose which line clip function to use based on use_wipe parameter
+        if use_wipe:
+            make_line = self._create_karaoke_line_clip_wipe
+            clip_type = "wipe"
+        else:
+            make_line = self._create_karaoke_line_clip
+            clip_type = "karaoke"
+        # Render the line texts in parallel up front; the loop below then hits the cache
+        _prerender_textclips(self._line_textclip_specs(lines, use_wipe), self.threads)
+        
+        # Lines alternate between top (even) and bottom (odd)
+        positions = (('center', self.y_top), ('center', self.y_bottom))
+        position_log = []
+        # Shared style for the break, count-in, outro and intro texts
+        text_kwargs = self._text_style(FONT_COLOR_INACTIVE)
+        first_line_start = 0
+        # Progress goes out at most once a second rather than per line
+        last_progress = time.monotonic()
+        
         # Process each line and detect gaps
         for i, line in enumerate(lines):
-            is_top = (i % 2 == 0)  # Alternate between top and bottom
-            
-            # Choose which line clip function to use based on use_wipe parameter
-            if use_wipe:
-                line_clip = self._create_karaoke_line_clip_wipe(line, is_top, duration)
-                clip_type = "wipe"
-            else:
-                line_clip = self._create_karaoke_line_clip(line, is_top, duration)
-                clip_type = "karaoke"
+            if i == 0:
+                first_line_start = line['start']
+            is_top = not (i & 1)
+            line_clip = make_line(line, is_top, duration)
+            now = time.monotonic()
+            if now - last_progress >= 1.0:
+                print(f"Built {i + 1}/{len(lines)} line clips...")
+                last_progress = now
                 
             if line_clip:
-                # Position the clip based on whether it should be top or bottom
-                y_position = self.y_top if is_top else self.y_bottom
-                positioned_clip = line_clip.set_position(('center', y_position))
-                line_clips.append(positioned_clip)
-                print(f"  Positioned {clip_type} line {i+1} at y={y_position}")
+                position = positions[i & 1]
+                line_clips.append(line_clip.set_position(position))
+                position_log.append(f"  Positioned {clip_type} line {i+1} at y={position[1]}")
             
             # Check for gap between this line and the next
             if i < len(lines) - 1:
                 gap_duration = lines[i + 1]['start'] - line['end']
                 if gap_duration > 10:
                     break_text = f"[{int(gap_duration)} second break]"
-                    break_clip = TextClip(
-                        break_text,
-                        fontsize=self.font_size,
-                        color=FONT_COLOR_INACTIVE,
-                        font=FONT_NAME,
-                        kerning=FONT_KERNING,
-                        stroke_color=FONT_COLOR_INACTIVE,
-                        stroke_width=self.stroke_width
-                    ).set_start(line['end'] + 1).set_duration(gap_duration - 2).set_position(('center', 'center'))
+                    break_clip = _cached_textclip(break_text, **text_kwargs).set_start(line['end'] + 1).set_duration(gap_duration - 2).set_position(('center', 'center'))
                     break_clip = break_clip.fadein(1).fadeout(1)
                     line_clips.append(break_clip)
                     print(f"Added break message: {break_text}")
@@ -188,41 +662,27 @@ class KaraokeVideoGenerator:
                                 next_dot_time = count_in_beats[-(dot_count-2)]  # Time of next set
                                 duration = next_dot_time - beat_time
                                 
-                                dot_clip = TextClip(
-                                    dots,
-                                    fontsize=self.font_size,
-                                    color=FONT_COLOR_INACTIVE,
-                                    font=FONT_NAME,
-                                    kerning=FONT_KERNING,
-                                    stroke_color=FONT_COLOR_INACTIVE,
-                                    stroke_width=self.stroke_width
-                                ).set_start(beat_time).set_duration(duration).set_position(('center', count_in_y))
+                                dot_clip = _cached_textclip(dots, **text_kwargs).set_start(beat_time).set_duration(duration).set_position(('center', count_in_y))
                                 line_clips.append(dot_clip)
                                 print(f"Added count-in dot {dot_count//2} at {beat_time:.2f}s (duration: {duration:.2f}s)")
         
+        # One print (one progress message) instead of one per line
+        if position_log:
+            print('\n'.join(position_log))
         print(f"Created {len(line_clips)} positioned line clips")
 
         # Handle outro if there's a significant gap after the last line
         if lines:
             last_line_end = lines[-1]['end']
-            outro_duration = audio.duration - last_line_end
+            outro_duration = audio_duration - last_line_end
             if outro_duration > 10:
                 outro_text = f"[{int(outro_duration)} second outro]"
-                outro_clip = TextClip(
-                    outro_text,
-                    fontsize=self.font_size,
-                    color=FONT_COLOR_INACTIVE,
-                    font=FONT_NAME,
-                    kerning=FONT_KERNING,
-                    stroke_color=FONT_COLOR_INACTIVE,
-                    stroke_width=self.stroke_width
-                ).set_start(last_line_end + 2).set_duration(outro_duration - 2).set_position(('center', 'center'))
+                outro_clip = _cached_textclip(outro_text, **text_kwargs).set_start(last_line_end + 2).set_duration(outro_duration - 2).set_position(('center', 'center'))
                 outro_clip = outro_clip.fadein(1).fadeout(1)
                 line_clips.append(outro_clip)
                 print(f"Added outro message: {outro_text}")
 
         # Handle intro based on timing of first line
-        first_line_start = lines[0]['start'] if lines else 0
         intro_clips = []
 
         # Process song title and artist to add newlines if needed
@@ -241,32 +701,14 @@ class KaraokeVideoGenerator:
         if first_line_start >= 5:
             # Create intro clip to be composited with the main video
             intro_text = f"{song_title}\n{artist}" if artist else song_title
-            intro_clip = TextClip(
-                intro_text,
-                fontsize=self.font_size,
-                color=FONT_COLOR_INACTIVE,
-                font=FONT_NAME,
-                kerning=FONT_KERNING,
-                stroke_color=FONT_COLOR_INACTIVE,
-                stroke_width=self.stroke_width,
-                align='center'
-            ).set_duration(first_line_start - 1).set_position(('center', 'center'))
+            intro_clip = _cached_textclip(intro_text, align='center', **text_kwargs).set_duration(first_line_start - 1).set_position(('center', 'center'))
             intro_clip = intro_clip.fadein(1).fadeout(1)
             line_clips.append(intro_clip)
         else:
             print(f"Added intro title during musical intro")
             # Create separate 5-second intro clip
             intro_text = f"{song_title}\n{artist}" if artist else song_title
-            intro_clip = TextClip(
-                intro_text,
-                fontsize=self.font_size,
-                color=FONT_COLOR_INACTIVE,
-                font=FONT_NAME,
-                kerning=FONT_KERNING,
-                stroke_color=FONT_COLOR_INACTIVE,
-                stroke_width=self.stroke_width,
-                align='center'
-            ).set_duration(5).set_position(('center', 'center'))
+            intro_clip = _cached_textclip(intro_text, align='center', **text_kwargs).set_duration(5).set_position(('center', 'center'))
             intro_clip = intro_clip.fadein(1).fadeout(1)
             intro_clips.append(intro_clip)
             print(f"Created separate 5-second intro clip")
@@ -274,42 +716,69 @@ class KaraokeVideoGenerator:
         # Combine all clips
         mode_name = "wipe" if use_wipe else "karaoke"
         print(f"Compositing {mode_name} video...")
-        final_video = CompositeVideoClip([background] + line_clips, use_bgclip=True)
-        
-        # Add audio
-        final_video = final_video.set_audio(audio)
-
+        # A separate intro plays first on the same timeline: push everything else (and the audio) back
+        audio_offset = 0
         if intro_clips:
-            intro_video = CompositeVideoClip([ColorClip(size=self.resolution, color=(0, 0, 0), duration=5)] + intro_clips)
-            final_video = concatenate_videoclips([intro_video, final_video])
+            audio_offset = 5
+            background = ColorClip(size=self.resolution, color=(0, 0, 0), duration=audio_duration + audio_offset)
+            line_clips = [clip.set_start(clip.start + audio_offset) for clip in line_clips] + intro_clips
+        final_video = _IndexedCompositeVideoClip([background] + line_clips, use_bgclip=True)
         
         
         # Sanitize output filename
         sanitized_name = "".join(c for c in output_name if c.isalnum() or c in (' ', '-', '_')).strip()
         sanitized_name = sanitized_name.replace(' ', '_')
         
-        # Write output file
+        # Write output file: silent frames first, then mux the instrumental in with ffmpeg
         output_path = os.path.join(self.output_dir, f"{sanitized_name}.mp4")
+        silent_path = os.path.join(self.output_dir, f"{sanitized_name}.noaudio.mp4")
         print(f"Writing {mode_name} video to: {output_path}")
         
-        final_video.write_videofile(
-            output_path,
-            fps=24,
-            codec='libx264',
-            audio_codec='aac',
-            verbose=False,
-            logger="bar",
-            threads=4,
-            preset="ultrafast"
-        )
-        
-        # Clean up
-        audio.close()
-        final_video.close()
+        codec, preset, ffmpeg_params = self._encoder_settings()
+        try:
+            final_video.write_videofile(
+                silent_path,
+                fps=24,
+                codec=codec,
+                audio=False,
+                verbose=False,
+                logger="bar",
+                threads=self.threads,
+                preset=preset,
+                ffmpeg_params=ffmpeg_params
+            )
+            
+            # Clean up
+            final_video.close()
+            
+            print("Adding audio track...")
+            _mux_audio(silent_path, instrumental_path, output_path, audio_offset)
+        finally:
+            if os.path.exists(silent_path):
+                os.remove(silent_path)
         
         print(f"Karaoke {mode_name} video generation complete!")
         return output_path
     
+    def _video_codec(self):
+        """Video encoder for MoviePy writes, honouring codec and use_gpu"""
+        if self.codec != 'auto':
+            return self.codec
+        return _pick_video_codec() if self.use_gpu else 'libx264'
+    
+    def _encoder_settings(self):
+        """(codec, preset, ffmpeg_params) for MoviePy writes; libx264 uses the configured preset"""
+        codec = self._video_codec()
+        preset, ffmpeg_params = _CODEC_SETTINGS.get(codec, ('medium', _COMMON_VIDEO_PARAMS))
+        if codec == 'libx264':
+            preset = self.preset
+        return codec, preset, ffmpeg_params
+    
+    def _debug(self, fmt, *args):
+        """Print a %-style diagnostic message, formatting it only when verbose"""
+        if self.verbose:
+            print(fmt % args)
+    
     def _group_words_into_lines(self, alignment_data):
         """
         Group words into lines based on line_end markers
@@ -320,50 +789,119 @@ class KaraokeVideoGenerator:
         Returns:
             List of line dictionaries, each containing words and timing info
         """
-        lines = []
-        current_line = []
+        # Alignment files that are already grouped into lines only need copying
+        lines = pregrouped_lines(alignment_data)
+        if lines is not None:
+            return lines
         
-        for word in alignment_data:
-            # Skip words without valid timing
-            if word.get('begin') is None or word.get('end') is None:
-                continue
-                
-            current_line.append(word)
-            
-            # If this word marks the end of a line, complete the line
-            if word.get('line_end', False):
-                if current_line:
-                    line_start = min(w['begin'] for w in current_line)
-                    line_end = max(w['end'] for w in current_line)
-                    line_text = ' '.join(w['text'] for w in current_line)
-                    
-                    lines.append({
-                        'words': current_line.copy(),
-                        'text': line_text,
-                        'start': line_start,
-                        'end': line_end,
-                        'line_number': len(lines)
-                    })
-                    print(f"Line {len(lines)}: '{line_text}' ({line_start:.2f}s - {line_end:.2f}s)")
-                    current_line = []
-        
-        # Handle any remaining words (in case last line doesn't have line_end marker)
-        if current_line:
-            line_start = min(w['begin'] for w in current_line)
-            line_end = max(w['end'] for w in current_line)
-            line_text = ' '.join(w['text'] for w in current_line)
+        # Skip words without valid timing
+        words = [word for word in alignment_data if word.get('begin') is not None and word.get('end') is not None]
+        if not words:
+            return []
+        
+        count = len(words)
+        begins = np.fromiter((w['begin'] for w in words), dtype=np.float64, count=count)
+        ends = np.fromiter((w['end'] for w in words), dtype=np.float64, count=count)
+        line_end_flags = np.fromiter((bool(w.get('line_end', False)) for w in words), dtype=bool, count=count)
+        
+        # A line closes after each line_end word; remaining words (in case the last
+        # line doesn't have a line_end marker) form one more line
+        stops = np.flatnonzero(line_end_flags) + 1
+        if not len(stops) or stops[-1] != count:
+            stops = np.append(stops, count)
+        firsts = np.concatenate(([0], stops[:-1]))
+        
+        # Every line's earliest begin and latest end in one call each
+        line_starts = np.minimum.reduceat(begins, firsts).tolist()
+        line_ends = np.maximum.reduceat(ends, firsts).tolist()
+        
+        lines = []
+        for first, stop, line_start, line_end in zip(firsts.tolist(), stops.tolist(), line_starts, line_ends):
+            line_words = words[first:stop]
+            line_text = ' '.join(w['text'] for w in line_words)
             
             lines.append({
-                'words': current_line.copy(),
+                'words': line_words,
                 'text': line_text,
                 'start': line_start,
                 'end': line_end,
                 'line_number': len(lines)
             })
-            print(f"Line {len(lines)}: '{line_text}' ({line_start:.2f}s - {line_end:.2f}s)")
+            self._debug("Line %d: '%s' (%.2fs - %.2fs)", len(lines), line_text, line_start, line_end)
         
         return lines
     
+    def _line_composite(self, clips, start_time):
+        """
+        Composite one line's clips into a clip that starts at start_time
+        
+        The clips are rebased to the line's start so the composite spans only the
+        line itself rather than the whole song from t=0. That keeps it a short clip
+        for _IndexedCompositeVideoClip's start-time index, and it is only asked for
+        frames while the line is on screen.
+        
+        Args:
+            clips: Clips positioned on the song timeline
+            start_time: When the line appears
+            
+        Returns:
+            CompositeVideoClip starting at start_time
+        """
+        return CompositeVideoClip([clip.set_start(clip.start - start_time) for clip in clips]).set_start(start_time)
+    
+    def _text_style(self, color, **extra):
+        """TextClip kwargs for the scaled font with text and stroke in color"""
+        return dict(fontsize=self.font_size, color=color, font=FONT_NAME, kerning=FONT_KERNING,
+                    stroke_color=color, stroke_width=self.stroke_width, **extra)
+    
+    def _line_textclip_specs(self, lines, use_wipe):
+        """
+        List the (text, TextClip kwargs) renders the line clip builders will request
+        
+        Args:
+            lines: Line dictionaries from _group_words_into_lines
+            use_wipe: Whether the wipe builder will be used (it draws its own masks)
+            
+        Returns:
+            List of (text, kwargs) tuples matching the _cached_textclip calls
+        """
+        white = self._text_style(FONT_COLOR_INACTIVE)
+        yellow = self._text_style(FONT_COLOR_ACTIVE)
+        mask = self._text_style(FONT_COLOR_INACTIVE, bg_color='black')
+        specs = []
+        for line in lines:
+            preprocessed_text, _ = self._line_display(line)
+            specs.append((preprocessed_text, white))
+            specs.append((preprocessed_text, yellow))
+            if use_wipe:
+                continue
+            # Progressive masks reveal one more word each time
+            word_offsets = _word_offsets(preprocessed_text)
+            revealed_count = 0
+            for word in line['words']:
+                if word.get('begin') is None or word.get('end') is None:
+                    continue
+                revealed_count += 1
+                specs.append((self._create_mask_text_with_newlines(preprocessed_text, revealed_count, word_offsets), mask))
+        return specs
+    
+    def _line_display(self, line):
+        """
+        Uppercase display text for a line, worked out once and kept on the line
+        
+        Args:
+            line: Line dictionary with words and timing
+            
+        Returns:
+            (preprocessed uppercase line text, uppercase text of each entry in line['words'])
+        """
+        display = line.get('_display')
+        if display is None:
+            display = (self._preprocess_line_text(line['text'].upper()),
+                       [word['text'].upper() for word in line['words']])
+            line['_display'] = display
+        return display
+    
     def _preprocess_line_text(self, line_text, max_chars_per_line=40):
         """
         Preprocess line text to add newlines at appropriate places for better display
@@ -405,68 +943,24 @@ class KaraokeVideoGenerator:
         
         return '\n'.join(lines)
     
-    def _create_mask_text_with_newlines(self, preprocessed_full_text, revealed_words):
+    def _create_mask_text_with_newlines(self, preprocessed_full_text, revealed_count, word_offsets):
         """
-        Create mask text that maintains newline structure while revealing only certain words
+        Create mask text that maintains newline structure while revealing only the first words
         
         Args:
             preprocessed_full_text: Full text with newlines already inserted
-            revealed_words: List of words that should be revealed
+            revealed_count: How many words from the start of the text should be revealed
+            word_offsets: Start offset of each word in the text, from _word_offsets
             
         Returns:
             Mask text with revealed words and spaces for unrevealed parts, maintaining newlines
         """
-        if not revealed_words:
-            # Return text with all words replaced by spaces, maintaining structure
-            result = ""
-            for char in preprocessed_full_text:
-                if char == '\n':
-                    result += '\n'
-                else:
-                    result += ' '
-            return result
-        
-        # Create the revealed text string
-        revealed_text = ' '.join(revealed_words)
-        
-        # Split both texts into words while preserving position information
-        full_words = []
-        current_word = ""
-        word_positions = []  # (start_pos, end_pos, word)
-        pos = 0
-        
-        # Parse the full text to get word positions
-        for i, char in enumerate(preprocessed_full_text):
-            if char.isspace() or char == '\n':
-                if current_word:
-                    word_positions.append((pos, pos + len(current_word), current_word.upper()))
-                    current_word = ""
-                    pos = i + 1
-                elif char == '\n':
-                    # Keep track of newlines
-                    pass
-            else:
-                current_word += char
-        
-        # Don't forget the last word if text doesn't end with space
-        if current_word:
-            word_positions.append((pos, pos + len(current_word), current_word.upper()))
+        if revealed_count >= len(word_offsets):
+            return preprocessed_full_text
         
-        # Create mask by revealing words progressively
-        mask_chars = list(preprocessed_full_text)
-        revealed_word_count = 0
-        
-        for start_pos, end_pos, word in word_positions:
-            if revealed_word_count < len(revealed_words):
-                # This word should be revealed
-                revealed_word_count += 1
-            else:
-                # This word should be hidden (replaced with spaces)
-                for i in range(len(word)):
-                    if start_pos + i < len(mask_chars):
-                        mask_chars[start_pos + i] = ' '
-        
-        return ''.join(mask_chars)
+        # Everything from the first hidden word on becomes spaces, keeping newlines
+        cut = word_offsets[revealed_count]
+        return preprocessed_full_text[:cut] + _NON_SPACE_PATTERN.sub(' ', preprocessed_full_text[cut:])
 
     def _create_word_spacing_for_wipe(self, preprocessed_text, target_word, word_index=0):
         """
@@ -524,7 +1018,7 @@ class KaraokeVideoGenerator:
 
     def _create_karaoke_line_clip(self, line, is_top, total_duration):
         """
-        Create a karaoke line clip with progressive word highlighting using individual masked clips
+        Create a karaoke line clip with progressive word highlighting using one yellow layer with a progressive mask
         
         Args:
             line: Line dictionary with words and timing
@@ -535,33 +1029,43 @@ class KaraokeVideoGenerator:
             VideoClip for this line with karaoke highlighting effect
         """
         try:
-            print(f"Creating karaoke line clip: '{line['text'][:50]}...'")
-            print(f"  Line timing: {line['start']:.2f}s - {line['end']:.2f}s")
-            print(f"  Words: {len(line['words'])}")
+            self._debug("Creating karaoke line clip: '%s...'", line['text'][:50])
+            self._debug("  Line timing: %.2fs - %.2fs", line['start'], line['end'])
+            self._debug("  Words: %d", len(line['words']))
             
             # Preprocess the line text with newlines
-            line_text = line['text'].upper()
-            preprocessed_text = self._preprocess_line_text(line_text)
-            print(f"  Preprocessed text:\n{repr(preprocessed_text)}")
+            preprocessed_text, _ = self._line_display(line)
+            self._debug("  Preprocessed text:\n%r", preprocessed_text)
             
             # Set timing for the line
             start_time = max(0, line['start'] - 0.6)
             end_time = line['end'] + 0.4
             duration = end_time - start_time
         
-            # Start with the base white clip
-            clips = []
+            # Yellow text of the whole preprocessed line, revealed word by word
+            yellow_line = _cached_textclip(
+                preprocessed_text,
+                fontsize=self.font_size,
+                color=FONT_COLOR_ACTIVE,
+                font=FONT_NAME,
+                kerning=FONT_KERNING,
+                stroke_color=FONT_COLOR_ACTIVE,
+                stroke_width=self.stroke_width
+            )
             
-            # Create progressive yellow clips for each word
-            words_so_far = []
+            # Progressive masks for each word, with the time each one takes over
+            word_offsets = _word_offsets(preprocessed_text)
+            revealed_count = 0
+            word_starts = []
+            word_masks = []
             
-            for i, word in enumerate(line['words']):
+            for word in line['words']:
                 # Skip words without valid timing
                 if word.get('begin') is None or word.get('end') is None:
                     continue
                 
-                # Add this word to the list of revealed words
-                words_so_far.append(word['text'].upper())
+                # Reveal one more word of the line
+                revealed_count += 1
                 
                 # Calculate timing for this word
                 word_start = max(start_time, float(word['begin']))
@@ -570,21 +1074,11 @@ class KaraokeVideoGenerator:
                 if word_duration <= 0:
                     continue
                 
-                # Create yellow text of the whole preprocessed line
-                yellow_text = TextClip(
-                    preprocessed_text,
-                    fontsize=self.font_size,
-                    color=FONT_COLOR_ACTIVE,
-                    font=FONT_NAME,
-                    kerning=FONT_KERNING,
-                    stroke_color=FONT_COLOR_ACTIVE,
-                    stroke_width=self.stroke_width
-                ).set_start(word_start).set_duration(word_duration)
-                
                 # Create mask text with proper newline handling
-                mask_text = self._create_mask_text_with_newlines(preprocessed_text, words_so_far)
+                mask_text = self._create_mask_text_with_newlines(preprocessed_text, revealed_count, word_offsets)
                 
-                word_mask = TextClip(
+                # Already converted to a mask
+                word_mask = _cached_textmask(
                     mask_text,
                     fontsize=self.font_size,
                     color=FONT_COLOR_INACTIVE,  # White reveals, black hides
@@ -593,19 +1087,13 @@ class KaraokeVideoGenerator:
                     bg_color='black',
                     stroke_color=FONT_COLOR_INACTIVE,
                     stroke_width=self.stroke_width
-                ).set_start(word_start).set_duration(word_duration)
-                
-                # Convert to mask
-                word_mask = word_mask.to_mask()
-                
-                # Apply mask to yellow text
-                masked_yellow = yellow_text.set_mask(word_mask)
+                )
                 
-                # Add to clips list
-                clips.append(masked_yellow)
+                word_starts.append(word_start)
+                word_masks.append(word_mask.get_frame(0))
             
             # Create base white text of the whole preprocessed line (always visible)
-            base_white = TextClip(
+            base_white = _cached_textclip(
                 preprocessed_text,
                 fontsize=self.font_size,
                 color=FONT_COLOR_INACTIVE,
@@ -616,14 +1104,21 @@ class KaraokeVideoGenerator:
             ).set_start(start_time).set_duration(duration).fadein(0.3).fadeout(0.4)
 
             # If no valid word clips were created, return just the white text
-            if len(clips) == 0:
+            if not word_starts:
                 print("  No valid word clips created, using simple white display")
                 return base_white
             
-            # Combine all clips into one composite clip
-            final_clip = CompositeVideoClip([base_white] + clips)
+            # One yellow layer whose mask switches to each word's reveal as it starts
+            reveal_start = min(word_starts)
+            reveal_duration = end_time - reveal_start
+            reveal = _RevealMask([start - reveal_start for start in word_starts], word_masks)
+            yellow_text = yellow_line.set_start(reveal_start).set_duration(reveal_duration).set_mask(
+                VideoClip(reveal, ismask=True, duration=reveal_duration))
             
-            print(f"  Created karaoke clip with {len(clips)} progressive yellow clips")
+            # Combine the white and yellow text into one composite clip
+            final_clip = self._line_composite([base_white, yellow_text], start_time)
+            
+            self._debug("  Created karaoke clip with %d progressive word masks", len(word_masks))
             
             return final_clip
             
@@ -646,29 +1141,28 @@ class KaraokeVideoGenerator:
             VideoClip for this line with karaoke wipe highlighting effect
         """
         try:
-            print(f"Creating karaoke line clip (wipe): '{line['text'][:50]}...'")
-            print(f"  Line timing: {line['start']:.2f}s - {line['end']:.2f}s")
-            print(f"  Words: {len(line['words'])}")
+            self._debug("Creating karaoke line clip (wipe): '%s...'", line['text'][:50])
+            self._debug("  Line timing: %.2fs - %.2fs", line['start'], line['end'])
+            self._debug("  Words: %d", len(line['words']))
             
             # Preprocess the line text with newlines
-            line_text = line['text'].upper()
-            preprocessed_text = self._preprocess_line_text(line_text)
-            print(f"  Preprocessed text:\n{repr(preprocessed_text)}")
+            preprocessed_text, upper_words = self._line_display(line)
+            self._debug("  Preprocessed text:\n%r", preprocessed_text)
             
             # Set timing for the line
             start_time = max(0, line['start'] - 0.6)
             end_time = line['end'] + 0.4
             duration = end_time - start_time
             
-            # Filter out words without valid timing
+            # Filter out words without valid timing, keeping their uppercase text alongside
             valid_words = []
-            for word in line['words']:
+            for word, upper_word in zip(line['words'], upper_words):
                 if word.get('begin') is not None and word.get('end') is not None:
-                    valid_words.append(word)
+                    valid_words.append((word, upper_word))
             
             if not valid_words:
                 print("  No valid words found, creating simple white text")
-                return TextClip(
+                return _cached_textclip(
                     preprocessed_text,
                     fontsize=self.font_size,
                     color=FONT_COLOR_INACTIVE,
@@ -679,7 +1173,7 @@ class KaraokeVideoGenerator:
                 ).set_start(start_time).set_duration(duration).fadein(0.3).fadeout(0.4)
             
             # Create base white text (always visible)
-            base_white = TextClip(
+            base_white = _cached_textclip(
                 preprocessed_text,
                 fontsize=self.font_size,
                 color=FONT_COLOR_INACTIVE,
@@ -690,7 +1184,7 @@ class KaraokeVideoGenerator:
             ).set_start(start_time).set_duration(duration).fadein(0.3).fadeout(0.4).set_position(('center', 'center'))
             
             # Create yellow text for the complete line
-            yellow_text = TextClip(
+            yellow_text = _cached_textclip(
                 preprocessed_text,
                 fontsize=self.font_size,
                 color=FONT_COLOR_ACTIVE,
@@ -700,14 +1194,13 @@ class KaraokeVideoGenerator:
                 stroke_width=self.stroke_width
             ).set_start(start_time).set_duration(duration).fadein(0.3).fadeout(0.4).set_position(('center', 'center'))
             
-            print(f"  Creating wipe effects for {len(valid_words)} words...")
+            self._debug("  Creating wipe effects for %d words...", len(valid_words))
             
             # Create Wipe instances for each word
             word_wipes = []
             word_occurrence_count = {}  # Track how many times we've seen each word
             
-            for word in valid_words:
-                word_text = word['text'].upper()
+            for word, word_text in valid_words:
                 
                 # Track which occurrence of this word we're processing
                 if word_text not in word_occurrence_count:
@@ -756,13 +1249,13 @@ class KaraokeVideoGenerator:
                 # single_clip.write_videofile(f"masked_yellow_{word['text']}.mp4", verbose=False, logger="bar")
                 # single_clip.close()
                 
-                print(f"    Created wipe mask for '{word['text']}' ({begin_time:.2f}s - {end_time:.2f}s)")
+                self._debug("    Created wipe mask for '%s' (%.2fs - %.2fs)", word['text'], begin_time, end_time)
             
             # Combine all clips
             all_clips = [base_white] + masked_clips
-            final_clip = CompositeVideoClip(all_clips)
+            final_clip = self._line_composite(all_clips, start_time)
             
-            print(f"  Created karaoke wipe clip with {len(masked_clips)} word wipes")
+            self._debug("  Created karaoke wipe clip with %d word wipes", len(masked_clips))
             
             return final_clip
             
@@ -772,7 +1265,7 @@ class KaraokeVideoGenerator:
             traceback.print_exc()
             return None
     
-    def test_alignment(self, audio_path, alignment_path, output_name):
+    def test_alignment(self, audio_path, alignment_path, output_name, preview=False):
         """
         Test function to create a simple word-by-word karaoke display.
         This helps verify that the alignment is working correctly.
@@ -781,108 +1274,157 @@ class KaraokeVideoGenerator:
             audio_path (str): Path to the audio file (can be full song or vocals)
             alignment_path (str): Path to the alignment JSON file from Viterbi alignment
             output_name (str): Name for the output video file
+            preview (bool): Draw frames at half resolution and let the encoder upscale
+                them, for a quicker check of the timing
             
         Returns:
             str: Path to the generated test video
         """
         print(f"Loading alignment data from: {alignment_path}")
         
-        # Load alignment data
-        with open(alignment_path, 'r', encoding='utf-8') as f:
-            alignment_data = json.load(f)
+        # Pull the timings into arrays in one pass; missing times become NaN
+        begins, ends, texts = [], [], []
+        with open(alignment_path, 'rb') as f:
+            # Stream the word list when ijson is available, else parse it whole
+            words = ijson.items(f, 'item', use_float=True) if ijson is not None else _json_loads(f.read())
+            for word in words:
+                begins.append(word.get('begin'))
+                ends.append(word.get('end'))
+                texts.append(word.get('text', ''))
+        begins = np.array(begins, dtype=float)
+        ends = np.array(ends, dtype=float)
+        texts = np.array(texts, dtype=object)
             
-        print(f"Loaded {len(alignment_data)} word alignments")
+        print(f"Loaded {len(texts)} word alignments")
         
         # Filter out words without timing information
-        valid_words = []
-        skipped_words = []
-        
-        for word in alignment_data:
-            if word.get('begin') is not None and word.get('end') is not None:
-                valid_words.append(word)
-            else:
-                skipped_words.append(word.get('text', 'unknown'))
-        
-        print(f"Valid words with timing: {len(valid_words)}")
-        if skipped_words:
+        timed = ~(np.isnan(begins) | np.isnan(ends))
+        print(f"Valid words with timing: {int(timed.sum())}")
+        if not timed.all():
+            skipped_words = texts[~timed].tolist()
             print(f"Skipped words without timing: {skipped_words[:10]}{'...' if len(skipped_words) > 10 else ''}")
+        begins, ends = begins[timed], ends[timed]
+        texts = np.array([text.upper() for text in texts[timed]], dtype=object)  # Uppercase for better visibility
         
-        # Load audio
+        # Only the duration is needed until the audio is written
         print(f"Loading audio from: {audio_path}")
-        audio = AudioFileClip(audio_path)
-        duration = audio.duration
+        duration = _probe_duration(audio_path)
         print(f"Audio duration: {duration:.2f} seconds")
         
-        # Create black background with scaled resolution
-        background = ColorClip(size=self.resolution, color=(0, 0, 0), duration=duration)
-        
-        # Create text clips for each word with valid timing
-        text_clips = []
-        for i, word in enumerate(valid_words):
+        # Fix and check all word timings with array operations
+        swapped = begins > ends
+        if swapped.any():
+            # Fix timing if start > end by swapping them
+            print(f"Swapped start/end times for {int(swapped.sum())} words: {texts[swapped][:10].tolist()}")
+        starts = np.minimum(begins, ends)
+        ends = np.maximum(begins, ends)
+        # Skip words with invalid timing (after potential swap)
+        keep = (starts < ends) & (starts >= 0) & (ends <= duration)
+        if not keep.all():
+            print(f"Skipped {int((~keep).sum())} words with invalid timing: {texts[~keep][:10].tolist()}")
+        order = np.argsort(starts[keep], kind='stable')
+        starts, ends, texts = starts[keep][order], ends[keep][order], texts[keep][order]
+        
+        # Render each distinct word once, blended onto black; frames paste the active word's bitmap
+        # Previews draw at half size (kept even for yuv420p) and are upscaled when encoding
+        render_scale = 0.5 if preview else 1.0
+        width, height = self.resolution
+        if preview:
+            width, height = width // 4 * 2, height // 4 * 2
+        stroke_width = max(1, int(self.stroke_width * render_scale))
+        word_bitmaps = {}
+        font_size = int(60 * self.scale_factor * render_scale)  # Scale test mode font size
+        if FONT_FILE:
+            # Draw with Pillow from the font file: one font load and one reused canvas
+            from PIL import Image, ImageDraw, ImageFont
+            font = ImageFont.truetype(FONT_FILE, font_size)
+            canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(canvas)
+        else:
+            word_style = dict(
+                fontsize=font_size,
+                color=FONT_COLOR_INACTIVE,
+                font=FONT_NAME,  # Changed to monospaced font
+                kerning=FONT_KERNING,
+                stroke_color=FONT_COLOR_INACTIVE,
+                stroke_width=stroke_width
+            )
+        unique_texts = set(texts.tolist())
+        if not FONT_FILE:
+            # Rasterize the distinct words across threads, one ImageMagick process each;
+            # words that fail are retried and reported one by one below
             try:
-                # Get timing information
-                start_time = float(word['begin'])
-                end_time = float(word['end'])
-                
-                # Fix timing if start > end by swapping them
-                if start_time > end_time:
-                    print(f"Swapping times for word '{word['text']}': {start_time:.2f} - {end_time:.2f} -> {end_time:.2f} - {start_time:.2f}")
-                    start_time, end_time = end_time, start_time
-                
-                # Skip words with invalid timing (after potential swap)
-                if start_time >= end_time or start_time < 0 or end_time > duration:
-                    print(f"Skipping word '{word['text']}' with invalid timing: {start_time:.2f} - {end_time:.2f}")
+                _prerender_textclips([(text, word_style) for text in unique_texts], self.threads)
+            except Exception as e:
+                print(f"Error pre-rendering words, rendering them one at a time: {e}")
+        for text in unique_texts:
+            try:
+                if FONT_FILE:
+                    draw.rectangle((0, 0, width, height), fill=(0, 0, 0, 0))
+                    draw.text((width // 2, height // 2), text, font=font, anchor='mm', fill=FONT_COLOR_INACTIVE,
+                              stroke_width=stroke_width, stroke_fill=FONT_COLOR_INACTIVE)
+                    box = canvas.getbbox()
+                    if box is None:
+                        continue
+                    x, y = box[0], box[1]
+                    rgba = np.asarray(canvas.crop(box))
+                    # Blend onto black
+                    bitmap = (rgba[:, :, :3] * (rgba[:, :, 3:] / 255.0)).astype(np.uint8)
+                    word_bitmaps[text] = (bitmap, y, x)
                     continue
                 
                 # Create text clip for this word with scaled font size
-                text_clip = (TextClip(
-                    word['text'].upper(),  # Convert to uppercase for better visibility
-                    fontsize=int(60 * self.scale_factor),  # Scale test mode font size
-                    color=FONT_COLOR_INACTIVE,
-                    font=FONT_NAME,  # Changed to monospaced font
-                    kerning=FONT_KERNING,
-                    stroke_color=FONT_COLOR_INACTIVE,
-                    stroke_width=self.stroke_width
-                )
-                .set_start(start_time)
-                .set_end(end_time)
-                .set_position(('center', 'center')))
-                
-                text_clips.append(text_clip)
-                
-                # Show progress every 50 words
-                if (i + 1) % 50 == 0:
-                    print(f"Processed {i + 1}/{len(valid_words)} words...")
-                    
+                text_clip = _cached_textclip(text, **word_style)
+                alpha = text_clip.mask.get_frame(0)[:height, :width, None]
+                rgb = text_clip.get_frame(0)[:height, :width]
+                bitmap = (rgb * alpha).astype(np.uint8)
+                # Centered, as set_position(('center', 'center')) would place it
+                y = (height - bitmap.shape[0]) // 2
+                x = (width - bitmap.shape[1]) // 2
+                word_bitmaps[text] = (bitmap, y, x)
             except Exception as e:
-                print(f"Error processing word {word.get('text', 'unknown')}: {e}")
-                continue
+                print(f"Error processing word {text}: {e}")
         
-        print(f"Created {len(text_clips)} text clips")
+        # Drop words that failed to render
+        rendered = np.array([text in word_bitmaps for text in texts], dtype=bool)
+        starts, ends, texts = starts[rendered], ends[rendered], texts[rendered]
+        print(f"Rendered {len(word_bitmaps)} distinct words for {len(texts)} timed words")
         
-        # Combine all clips
-        print("Compositing video...")
-        final_video = CompositeVideoClip([background] + text_clips)
-        
-        # Add audio
-        final_video = final_video.set_audio(audio)
+        make_frame = _WordFrames(starts, ends, texts.tolist(), word_bitmaps, (width, height), duration)
         
         # Write output file
         output_path = os.path.join(self.output_dir, f"{output_name}_test.mp4")
         print(f"Writing video to: {output_path}")
         
-        final_video.write_videofile(
-            output_path,
-            fps=24,
-            codec='libx264',
-            audio_codec='aac',
-            verbose=False,
-            logger=None
-        )
-        
-        # Clean up
-        audio.close()
-        final_video.close()
+        # Write silent frames, then mux the audio in with ffmpeg
+        silent_path = os.path.join(self.output_dir, f"{output_name}_test.noaudio.mp4")
+        try:
+            if av is not None and self.codec == 'auto':
+                # Encode the frames in-process (libx264); an explicit codec goes through MoviePy
+                _encode_frames_parallel(make_frame, duration, (width, height), silent_path, threads=self.threads,
+                                        output_size=self.resolution, preset=self.preset)
+            else:
+                print("Compositing video...")
+                final_video = VideoClip(make_frame, duration=duration)
+                codec, preset, ffmpeg_params = self._encoder_settings()
+                if preview:
+                    ffmpeg_params = ffmpeg_params + ['-vf', f'scale={self.resolution[0]}:{self.resolution[1]}:flags=lanczos']
+                final_video.write_videofile(
+                    silent_path,
+                    fps=24,
+                    codec=codec,
+                    audio=False,
+                    verbose=False,
+                    logger=None,
+                    threads=self.threads,
+                    preset=preset,
+                    ffmpeg_params=ffmpeg_params
+                )
+                final_video.close()
+            _mux_audio(silent_path, audio_path, output_path)
+        finally:
+            if os.path.exists(silent_path):
+                os.remove(silent_path)
         
         print(f"Video generation complete!")
         return output_path
@@ -1032,6 +1574,10 @@ if __name__ == "__main__":
                         help='Video resolution. Options: "WIDTHxHEIGHT" (e.g. "1920x1080") or just "HEIGHT" (e.g. "1080" for 1920x1080). Always maintains 16:9 aspect ratio (default: 1280x720)')
     parser.add_argument('--mode', choices=['test', 'karaoke'], default='karaoke',
                         help='Generation mode: "test" for simple word-by-word, "karaoke" for full karaoke style (default: karaoke)')
+    parser.add_argument('--preview', action='store_true',
+                        help='Test mode only: draw at half resolution and upscale while encoding for a faster check')
+    parser.add_argument('--codec', default='auto',
+                        help='ffmpeg video encoder, e.g. "libx264" or "h264_nvenc" (default: auto-detect hardware H.264)')
     args = parser.parse_args()
     
     # Set default output directory to alignment file's directory
@@ -1046,7 +1592,7 @@ if __name__ == "__main__":
     os.makedirs(args.output_dir, exist_ok=True)
     
     # Initialize video generator with specified resolution
-    video_gen = KaraokeVideoGenerator(args.output_dir, resolution=args.resolution)
+    video_gen = KaraokeVideoGenerator(args.output_dir, resolution=args.resolution, codec=args.codec)
     
     print(f"Generating {args.mode} video...")
     print(f"Audio: {args.audio}")
@@ -1059,7 +1605,7 @@ if __name__ == "__main__":
     try:
         if args.mode == 'test':
             # Generate simple test video
-            video_path = video_gen.test_alignment(args.audio, args.alignment, args.output_name)
+            video_path = video_gen.test_alignment(args.audio, args.alignment, args.output_name, preview=args.preview)
         else:  # karaoke mode
             # Generate full karaoke video
             video_path = video_gen.generate(args.audio, args.alignment, args.output_name)